@@ -2,13 +2,16 @@ from __future__ import annotations
 
 import json
 import os
+import pickle
 import subprocess
 import sys
-from copy import deepcopy
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Callable, Dict, List, Sequence, Tuple
 
+import numpy as np
+
 from models import config as cfg
 from scheduler.baseline_scheduler import assign_requests_greedy, simulate_dispatch
 from models.objective import (
@@ -26,42 +29,52 @@ from models.utils import (
 )
 from models.variables import ElevatorState
 from scheduler.mpc_scheduler import assign_requests_mpc
-from scheduler.mpc_scheduler.prediction_api import load_destination_model
+from scheduler.mpc_scheduler.prediction_api import is_ready, load_destination_model
+
+
+STRATEGY_FUNCTIONS: Dict[str, Callable[..., None]] = {
+    "baseline": assign_requests_greedy,
+    "mpc": assign_requests_mpc,
+}
 
 
-def _extract_wait_times(served_requests) -> List[float]:
-    """Collect wait durations per request / 提取每个请求的等待时间。"""
-    waits: List[float] = []
-    for req in served_requests:
-        arrival = getattr(req, "arrival_time", None)
-        origin_arrival = getattr(req, "origin_arrival_time", None)
-        pickup = getattr(req, "pickup_time", None)
-        if arrival is None:
-            continue
-        boarding_time = origin_arrival if origin_arrival is not None else pickup
-        if boarding_time is None:
-            continue
-        waits.append(max(boarding_time - arrival, 0.0))
-    return waits
+def _init_strategy_worker() -> None:
+    """Install the destination model inside a pool worker / 在进程池工作进程中加载目的地模型。
+
+    A forked worker already holds the parent's model; otherwise it is loaded
+    the same way as in the parent, so failures are reported /
+    fork 出的工作进程已持有父进程的模型；否则按与父进程相同的方式加载并报告失败。
+    """
+    if not is_ready():
+        _maybe_load_destination_model()
 
 
 def _run_strategy(
     day_label: str,
     day_type: str,
     name: str,
-    assign_fn: Callable[[List[object], List[ElevatorState]], None],
-    base_requests: List[object],
+    requests_blob: bytes,
+    theoretical: Dict[str, object],
 ) -> Dict[str, object]:
     """
     Execute a scheduling strategy and gather metrics /
     执行给定调度策略并收集指标。
+
+    The strategy is passed by name and resolved here so the call can be
+    shipped to a worker process / 策略按名称传入并在此解析，便于提交到工作进程。
+    Requests arrive pickled once per day; unpickling yields a private copy /
+    请求按天预先序列化，反序列化即得到独立副本。
+    `theoretical` is the day's strategy-independent lower bound /
+    `theoretical` 为当天与策略无关的理论下界。
     """
-    requests_copy = deepcopy(base_requests)
+    assign_fn = STRATEGY_FUNCTIONS[name]
+    requests_copy = pickle.loads(requests_blob)
     elevators = [ElevatorState(id=k + 1, floor=1) for k in range(cfg.ELEVATOR_COUNT)]
 
     if name == "mpc":
         weekday_idx = DAY_NAME_TO_WEEKDAY.get(day_label, 0)
-        assign_fn(requests_copy, elevators, weekday=weekday_idx)
+        # Generated requests are already sorted by arrival / 生成的请求已按到达排序
+        assign_fn(requests_copy, elevators, weekday=weekday_idx, sorted_input=True)
     else:
         assign_fn(requests_copy, elevators)
 
@@ -72,7 +85,7 @@ def _run_strategy(
         emptyload_energy,
     ) = simulate_dispatch(elevators)
 
-    passenger_metrics = summarize_passenger_metrics(served_requests)
+    passenger_metrics, wait_times = summarize_passenger_metrics(served_requests)
     running_energy = total_energy
 
     objective_breakdown = compute_objective(
@@ -80,37 +93,9 @@ def _run_strategy(
         passenger_metrics.total_in_cab_time,
         emptyload_energy,
         running_energy,
-        wait_penalty_value=passenger_metrics.wait_penalty_total,
+        passenger_metrics.wait_penalty_total,
         zero_wait_count=passenger_metrics.zero_wait_count,
     )
-    (
-        theoretical_breakdown,
-        theoretical_in_cab_time,
-        theoretical_running_energy,
-        theoretical_wait_time,
-        theoretical_wait_penalty,
-    ) = compute_theoretical_limit(served_requests)
-
-    wait_times = _extract_wait_times(served_requests)
-
-    if cfg.SIM_ENABLE_LOG:
-        log_results(
-            elevators,
-            system_time,
-            running_energy,
-            objective_breakdown,
-            passenger_metrics.total_passenger_time,
-            passenger_metrics.total_wait_time,
-            passenger_metrics.total_in_cab_time,
-            passenger_metrics.wait_penalty_total,
-            emptyload_energy,
-            theoretical_breakdown,
-            theoretical_in_cab_time,
-            theoretical_running_energy,
-            theoretical_wait_time,
-            theoretical_wait_penalty,
-            strategy_label=f"{day_label}_{name}",
-        )
 
     return {
         "day": day_label,
@@ -126,17 +111,56 @@ def _run_strategy(
         "passenger_in_cab_time": passenger_metrics.total_in_cab_time,
         "wait_penalty": passenger_metrics.wait_penalty_total,
         "objective": objective_breakdown,
-        "theoretical": {
-            "breakdown": theoretical_breakdown,
-            "in_cab_time": theoretical_in_cab_time,
-            "running_energy": theoretical_running_energy,
-            "wait_time": theoretical_wait_time,
-            "wait_penalty": theoretical_wait_penalty,
-        },
+        "theoretical": theoretical,
         "wait_times": wait_times,
     }
 
 
+def _theoretical_summary(requests: List[object]) -> Dict[str, object]:
+    """
+    Lower bound for a day's request set / 计算某日请求集合的理论下界。
+
+    Depends only on origin/destination/load/arrival, so it is shared by all
+    strategies of the day / 仅依赖起点、终点、载重与到达时间，同日各策略共用。
+    """
+    (
+        breakdown,
+        in_cab_time,
+        running_energy,
+        wait_time,
+        wait_penalty,
+    ) = compute_theoretical_limit(requests)
+    return {
+        "breakdown": breakdown,
+        "in_cab_time": in_cab_time,
+        "running_energy": running_energy,
+        "wait_time": wait_time,
+        "wait_penalty": wait_penalty,
+    }
+
+
+def _log_strategy_result(result: Dict[str, object]) -> None:
+    """Write the per-strategy log from a collected result / 根据汇总结果写入策略日志。"""
+    theo = result["theoretical"]
+    log_results(
+        result["elevators"],
+        result["system_time"],
+        result["running_energy"],
+        result["objective"],
+        result["passenger_total_time"],
+        result["passenger_wait_time"],
+        result["passenger_in_cab_time"],
+        result["wait_penalty"],
+        result["emptyload_energy"],
+        theo["breakdown"],
+        theo["in_cab_time"],
+        theo["running_energy"],
+        theo["wait_time"],
+        theo["wait_penalty"],
+        strategy_label=f"{result['day']}_{result['name']}",
+    )
+
+
 DAY_SCHEDULE: Sequence[Tuple[str, str]] = (
     ("Mon", "weekday"),
     ("Tue", "weekday"),
@@ -290,39 +314,52 @@ def main() -> None:
     if cfg.ONLINE_LEARNING_ENABLE:
         online_data_dir = _prepare_online_learning_run_dir()
 
-    strategies: Sequence[
-        Tuple[str, Callable[[List[object], List[ElevatorState]], None]]
-    ] = (
-        ("baseline", assign_requests_greedy),
-        ("mpc", assign_requests_mpc),
-    )
+    strategies: Sequence[str] = ("baseline", "mpc")
 
     results: List[Dict[str, object]] = []
+    submitted = []
+
+    # Strategies share no state, so each one runs in its own worker process.
+    # 各策略互不共享状态，分别在独立进程中运行。
+    with ProcessPoolExecutor(
+        max_workers=len(strategies), initializer=_init_strategy_worker
+    ) as pool:
+        for day_index, (day_label, day_type) in enumerate(DAY_SCHEDULE):
+            seed_shift = day_index * 114514
+            if day_type == "weekday":
+                requests = generate_requests_weekday(
+                    cfg.WEEKDAY_TOTAL_REQUESTS, seed_shift=seed_shift
+                )
+            else:
+                requests = generate_requests_weekend(
+                    cfg.WEEKEND_TOTAL_REQUESTS, seed_shift=seed_shift
+                )
 
-    for day_index, (day_label, day_type) in enumerate(DAY_SCHEDULE):
-        seed_shift = day_index * 114514
-        if day_type == "weekday":
-            requests = generate_requests_weekday(
-                cfg.WEEKDAY_TOTAL_REQUESTS, seed_shift=seed_shift
-            )
-        else:
-            requests = generate_requests_weekend(
-                cfg.WEEKEND_TOTAL_REQUESTS, seed_shift=seed_shift
-            )
+            weekday_index = DAY_NAME_TO_WEEKDAY.get(day_label, day_index % 7)
+            requests_blob = pickle.dumps(requests, protocol=pickle.HIGHEST_PROTOCOL)
+            theoretical = _theoretical_summary(requests)
 
-        weekday_index = DAY_NAME_TO_WEEKDAY.get(day_label, day_index % 7)
+            for strat_name in strategies:
+                future = pool.submit(
+                    _run_strategy,
+                    day_label,
+                    day_type,
+                    strat_name,
+                    requests_blob,
+                    theoretical,
+                )
+                submitted.append(
+                    (day_index, day_label, weekday_index, strat_name, future)
+                )
 
-        for strat_name, assign_fn in strategies:
-            result = _run_strategy(
-                day_label,
-                day_type,
-                strat_name,
-                assign_fn,
-                requests,
-            )
+        for day_index, day_label, weekday_index, strat_name, future in submitted:
+            result = future.result()
             result["label"] = f"{day_label}-{strat_name}"
             results.append(result)
 
+            if cfg.SIM_ENABLE_LOG:
+                _log_strategy_result(result)
+
             if (
                 cfg.ONLINE_LEARNING_ENABLE
                 and strat_name == "mpc"
@@ -340,50 +377,69 @@ def main() -> None:
     enable_time_plot = cfg.SIM_ENABLE_PLOTS or cfg.SIM_ENABLE_PLOTS_TIME
     enable_dist_plot = cfg.SIM_ENABLE_PLOTS or cfg.SIM_ENABLE_PLOTS_DISTRIBUTION
 
-    aggregated_waits: Dict[str, List[float]] | None = (
+    aggregated_waits: Dict[str, List[np.ndarray]] | None = (
         {"baseline": [], "mpc": []} if enable_dist_plot else None
     )
 
+    # Plots render on one background thread while the summary prints; pyplot
+    # keeps global state, so rendering itself stays serial.
+    # 图像在单个后台线程中渲染，与结果打印并行；pyplot 有全局状态，故渲染仍串行。
+    plot_pool: ThreadPoolExecutor | None = None
+    plot_futures: List[Future] = []
+
     if enable_global_plot or enable_time_plot or enable_dist_plot:
+        plot_pool = ThreadPoolExecutor(max_workers=1)
         for result in results:
             strat_name = result["name"]
             day_label = result["day"]
             elevator_list = result["elevators"]
 
             if enable_dist_plot and aggregated_waits is not None:
-                aggregated_waits.setdefault(strat_name, []).extend(result["wait_times"])
+                aggregated_waits.setdefault(strat_name, []).append(result["wait_times"])
 
             if enable_global_plot:
                 title_label = f"{day_label} — {strat_name.title()} Strategy"
                 base_filename = f"{day_label.lower()}_{strat_name}"
-                plot_elevator_movements(
-                    elevator_list,
-                    filename=os.path.join(
-                        DEFAULT_PLOT_DIR,
-                        f"elevator_schedule_global_{base_filename}.png",
-                    ),
-                    strategy_label=title_label,
+                plot_futures.append(
+                    plot_pool.submit(
+                        plot_elevator_movements,
+                        elevator_list,
+                        filename=os.path.join(
+                            DEFAULT_PLOT_DIR,
+                            f"elevator_schedule_global_{base_filename}.png",
+                        ),
+                        strategy_label=title_label,
+                    )
                 )
 
             if enable_time_plot:
                 title_label = f"{day_label} — {strat_name.title()} Strategy"
                 base_filename = f"{day_label.lower()}_{strat_name}"
-                plot_elevator_movements_time(
-                    elevator_list,
-                    filename=os.path.join(
-                        DEFAULT_PLOT_DIR,
-                        f"elevator_schedule_time_global_{base_filename}.png",
-                    ),
-                    strategy_label=title_label,
+                plot_futures.append(
+                    plot_pool.submit(
+                        plot_elevator_movements_time,
+                        elevator_list,
+                        filename=os.path.join(
+                            DEFAULT_PLOT_DIR,
+                            f"elevator_schedule_time_global_{base_filename}.png",
+                        ),
+                        strategy_label=title_label,
+                    )
                 )
 
         if enable_dist_plot and aggregated_waits is not None:
             overall_wait_series = [
-                (strat.upper(), waits) for strat, waits in aggregated_waits.items()
+                (strat.upper(), np.concatenate(chunks) if chunks else np.empty(0))
+                for strat, chunks in aggregated_waits.items()
             ]
-            plot_wait_distribution(
-                overall_wait_series,
-                filename=os.path.join(DEFAULT_PLOT_DIR, "wait_distribution_week.png"),
+            plot_futures.append(
+                plot_pool.submit(
+                    plot_wait_distribution,
+                    overall_wait_series,
+                    filename=os.path.join(
+                        DEFAULT_PLOT_DIR, "wait_distribution_week.png"
+                    ),
+                )
             )
 
     weekly_totals = {
@@ -497,6 +553,11 @@ def main() -> None:
         )
         print("Objective Cost (sum over week): {:.2f}".format(totals["objective"]))
 
+    if plot_pool is not None:
+        for future in plot_futures:
+            future.result()
+        plot_pool.shutdown()
+
     if cfg.ONLINE_LEARNING_ENABLE:
         _invoke_offline_training(online_data_dir)
 
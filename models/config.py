@@ -134,6 +134,8 @@ ONLINE_LEARNING_L2 = 1e-4
 # ------------------------
 MPC_LOOKAHEAD_WINDOW = 240.0  # MPC 预测窗口长度 (s) / default look-ahead horizon
 MPC_MAX_BATCH = 12  # MPC 最大批处理请求数 / max batched requests per solve
+MPC_TRIGGER_EPS = 0.0  # 复用上次决策所允许的电梯楼层偏差 / floor drift tolerated before re-solving
+MPC_MAX_SKIP = 0  # 连续复用步数上限，0 表示不限 / max consecutive reused steps (0 = unlimited)
 
 # ============================================================
 # Request Generation Parameters (Detailed) / 请求生成细节
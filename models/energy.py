@@ -1,23 +1,43 @@
 import math
+from functools import lru_cache
+
+import numpy as np
+
 from models import config as cfg
-from models.kinematics import vmax_up, vmax_down, acc as accel, dec as decel
+from models.kinematics import (
+    UP,
+    acc_vec,
+    dec_vec,
+    kinematic_limits,
+    vmax_down_vec,
+    vmax_up_vec,
+)
+
+# Config constants resolved once at import / 导入时解析的配置常量
+_EFF = max(cfg.ENERGY_MOTOR_EFFICIENCY, 1e-9)
+_CAR_MASS = cfg.ENERGY_CAR_MASS
+_COUNTERWEIGHT_MASS = cfg.ENERGY_COUNTERWEIGHT_MASS
+_FRICTION = cfg.ENERGY_FRICTION_PER_METER
+_STANDBY_POWER = cfg.ENERGY_STANDBY_POWER
+_G = 9.81
 
 
 def _positive(value: float) -> float:
     return value if value > 0.0 else 0.0
 
 
-def segment_energy(load, distance, direction="up"):
+@lru_cache(maxsize=4096)
+def segment_energy(load, distance, direction=UP):
     """Segment energy with kinematic decomposition (no regen) / 按加速-匀速-减速分段计算能耗（不含能量回收）。"""
     if distance <= 0:
         return 0.0
 
-    eff = max(cfg.ENERGY_MOTOR_EFFICIENCY, 1e-9)
-    g = 9.81
+    eff = _EFF
+    g = _G
 
-    vmax = vmax_up(load) if direction == "up" else vmax_down(load)
-    a_acc = max(accel(load), 1e-9)
-    a_dec = max(decel(load), 1e-9)
+    vmax, a_acc, a_dec = kinematic_limits(load, direction)
+    a_acc = max(a_acc, 1e-9)
+    a_dec = max(a_dec, 1e-9)
 
     v_peak_tri = math.sqrt(
         max(2.0 * distance * a_acc * a_dec / max(a_acc + a_dec, 1e-9), 0.0)
@@ -34,12 +54,11 @@ def segment_energy(load, distance, direction="up"):
         d_dec = v_peak**2 / (2.0 * a_dec)
         d_const = max(distance - d_acc - d_dec, 0.0)
 
-    M_eq = (
-        cfg.ENERGY_CAR_MASS + load
-    )  # 等效运动质量 M0 + γL，此处取 γ=1 / equivalent moving mass.
-    delta_mass = (cfg.ENERGY_CAR_MASS + load) - cfg.ENERGY_COUNTERWEIGHT_MASS
-    sign = 1 if direction == "up" else -1
-    friction = cfg.ENERGY_FRICTION_PER_METER
+    # 等效运动质量 M0 + γL，此处取 γ=1 / equivalent moving mass.
+    M_eq = _CAR_MASS + load
+    delta_mass = (_CAR_MASS + load) - _COUNTERWEIGHT_MASS
+    sign = 1 if direction else -1
+    friction = _FRICTION
 
     e_acc = (
         _positive(
@@ -58,9 +77,67 @@ def segment_energy(load, distance, direction="up"):
     return e_acc + e_const + e_dec
 
 
-def standby_energy(duration):
+def segment_energy_vec(load, distance, up):
+    """Vectorised segment_energy over NumPy arrays / segment_energy 的向量化版本。
+
+    EN: `up` is a boolean mask (True for upward segments); segments with
+    non-positive distance contribute zero.
+
+    ZH: `up` 为布尔掩码（上行为 True）；距离非正的分段能耗为 0。
+    """
+    load = np.asarray(load, dtype=np.float64)
+    distance = np.asarray(distance, dtype=np.float64)
+    up = np.asarray(up, dtype=bool)
+
+    vmax = np.where(up, vmax_up_vec(load), vmax_down_vec(load))
+    a_acc = np.maximum(acc_vec(load), 1e-9)
+    a_dec = np.maximum(dec_vec(load), 1e-9)
+
+    v_peak_tri = np.sqrt(
+        np.maximum(
+            2.0 * distance * a_acc * a_dec / np.maximum(a_acc + a_dec, 1e-9), 0.0
+        )
+    )
+    triangular = v_peak_tri <= vmax + 1e-9
+    v_peak = np.where(triangular, v_peak_tri, vmax)
+    d_acc = v_peak**2 / (2.0 * a_acc)
+    d_dec = v_peak**2 / (2.0 * a_dec)
+    d_const = np.where(triangular, 0.0, np.maximum(distance - d_acc - d_dec, 0.0))
+
+    M_eq = _CAR_MASS + load
+    delta_mass = (_CAR_MASS + load) - _COUNTERWEIGHT_MASS
+    sign = np.where(up, 1.0, -1.0)
+    friction = _FRICTION
+
+    e_acc = (
+        np.maximum(
+            0.5 * M_eq * v_peak**2 + sign * _G * delta_mass * d_acc + friction * d_acc,
+            0.0,
+        )
+        / _EFF
+    )
+    e_const = (
+        np.maximum(sign * _G * delta_mass * d_const + friction * d_const, 0.0) / _EFF
+    )
+    e_dec = (
+        np.maximum(
+            -0.5 * M_eq * v_peak**2 + sign * _G * delta_mass * d_dec + friction * d_dec,
+            0.0,
+        )
+        / _EFF
+    )
+
+    return np.where(distance > 0, e_acc + e_const + e_dec, 0.0)
+
+
+def cache_clear():
+    """Drop memoised segment energies (test isolation) / 清空分段能耗缓存（便于测试隔离）。"""
+    segment_energy.cache_clear()
+
+
+def standby_energy(duration, _STANDBY_POWER=_STANDBY_POWER):
     """Baseline auxiliary energy proportional to elapsed time / 按时间计算的基础附属能耗。"""
-    return cfg.ENERGY_STANDBY_POWER * max(duration, 0.0)
+    return _STANDBY_POWER * max(duration, 0.0)
 """
 Energy model / 能耗模型
 -----------------------
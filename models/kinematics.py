@@ -1,50 +1,119 @@
 import math
+from functools import lru_cache
+
+import numpy as np
+
 from models import config as cfg
+from models.kinematics_fast import travel_time as _tt_core  # JIT kernel / JIT 内核
+
+# Config constants resolved once at import / 导入时解析的配置常量
+_H = cfg.BUILDING_FLOOR_HEIGHT
+_CAP = cfg.ELEVATOR_CAPACITY
+_VUF = cfg.KIN_MAX_SPEED_UP_FULL
+_VUE = cfg.KIN_MAX_SPEED_UP_EMPTY
+_VDF = cfg.KIN_MAX_SPEED_DOWN_FULL
+_VDE = cfg.KIN_MAX_SPEED_DOWN_EMPTY
+_K_S = cfg.KIN_SPEED_DECAY_RATE
+_AUF = cfg.KIN_ACC_UP_FULL
+_AUE = cfg.KIN_ACC_UP_EMPTY
+_DUF = cfg.KIN_DEC_DOWN_FULL
+_DUE = cfg.KIN_DEC_DOWN_EMPTY
+_K_A = cfg.KIN_ACC_DECAY_RATE
+
+# Travel direction flags; `destination > origin` yields UP/DOWN directly /
+# 行驶方向标志，`destination > origin` 的结果可直接作为 UP/DOWN 传入。
+UP = 1
+DOWN = 0
 
 
 def vmax_up(load):
     """Load-dependent upward velocity / 载荷相关的上行极限速度."""
-    return cfg.KIN_MAX_SPEED_UP_FULL + (
-        cfg.KIN_MAX_SPEED_UP_EMPTY - cfg.KIN_MAX_SPEED_UP_FULL
-    ) * math.exp(-cfg.KIN_SPEED_DECAY_RATE * load / cfg.ELEVATOR_CAPACITY)
+    return _VUF + (_VUE - _VUF) * math.exp(-_K_S * load / _CAP)
 
 
 def vmax_down(load):
     """Load-dependent downward velocity / 载荷相关的下行极限速度."""
-    return cfg.KIN_MAX_SPEED_DOWN_FULL + (
-        cfg.KIN_MAX_SPEED_DOWN_EMPTY - cfg.KIN_MAX_SPEED_DOWN_FULL
-    ) * math.exp(-cfg.KIN_SPEED_DECAY_RATE * load / cfg.ELEVATOR_CAPACITY)
+    return _VDF + (_VDE - _VDF) * math.exp(-_K_S * load / _CAP)
 
 
 def acc(load):
     """Load-dependent acceleration / 载荷相关的加速度."""
-    return cfg.KIN_ACC_UP_FULL + (
-        cfg.KIN_ACC_UP_EMPTY - cfg.KIN_ACC_UP_FULL
-    ) * math.exp(-cfg.KIN_ACC_DECAY_RATE * load / cfg.ELEVATOR_CAPACITY)
+    return _AUF + (_AUE - _AUF) * math.exp(-_K_A * load / _CAP)
 
 
 def dec(load):
     """Load-dependent deceleration / 载荷相关的减速度."""
-    return cfg.KIN_DEC_DOWN_FULL + (
-        cfg.KIN_DEC_DOWN_EMPTY - cfg.KIN_DEC_DOWN_FULL
-    ) * math.exp(-cfg.KIN_ACC_DECAY_RATE * load / cfg.ELEVATOR_CAPACITY)
+    return _DUF + (_DUE - _DUF) * math.exp(-_K_A * load / _CAP)
+
+
+def kinematic_limits(load, up=True):
+    """Return (vmax, acc, dec) for one load / 一次性返回某载荷下的 (vmax, acc, dec)。
+
+    EN: vmax_up/vmax_down share one decay exponential and acc/dec share
+    another, so each is evaluated once instead of once per curve.
+
+    ZH: 速度与加减速度各共用一个衰减指数，每个只计算一次。
+    """
+    speed_decay = math.exp(-_K_S * load / _CAP)
+    acc_decay = math.exp(-_K_A * load / _CAP)
+    if up:
+        vmax = _VUF + (_VUE - _VUF) * speed_decay
+    else:
+        vmax = _VDF + (_VDE - _VDF) * speed_decay
+    a_acc = _AUF + (_AUE - _AUF) * acc_decay
+    a_dec = _DUF + (_DUE - _DUF) * acc_decay
+    return vmax, a_acc, a_dec
+
+
+def vmax_up_vec(load):
+    """Vectorised vmax_up over NumPy arrays / vmax_up 的向量化版本。"""
+    return _VUF + (_VUE - _VUF) * np.exp(-_K_S * load / _CAP)
+
+
+def vmax_down_vec(load):
+    """Vectorised vmax_down over NumPy arrays / vmax_down 的向量化版本。"""
+    return _VDF + (_VDE - _VDF) * np.exp(-_K_S * load / _CAP)
+
+
+def acc_vec(load):
+    """Vectorised acc over NumPy arrays / acc 的向量化版本。"""
+    return _AUF + (_AUE - _AUF) * np.exp(-_K_A * load / _CAP)
+
+
+def dec_vec(load):
+    """Vectorised dec over NumPy arrays / dec 的向量化版本。"""
+    return _DUF + (_DUE - _DUF) * np.exp(-_K_A * load / _CAP)
+
+
+def travel_time_vec(load, origin_floor, destination_floor):
+    """Vectorised travel_time (element-wise, broadcasting) / travel_time 的逐元素向量化版本（支持广播）。"""
+    load = np.asarray(load, dtype=np.float64)
+    origin_floor = np.asarray(origin_floor)
+    destination_floor = np.asarray(destination_floor)
+
+    distance = np.abs(destination_floor - origin_floor) * _H
+    up_mask = destination_floor > origin_floor
+
+    vmax = np.where(up_mask, vmax_up_vec(load), vmax_down_vec(load))
+    a_acc = acc_vec(load)
+    a_dec = dec_vec(load)
+
+    v_peak = np.sqrt(2 * distance * a_acc * a_dec / (a_acc + a_dec))
 
+    # triangular vs trapezoidal profile / 三角与梯形速度曲线
+    tri = v_peak * (1 / a_acc + 1 / a_dec)
+    d_const = np.maximum(
+        distance - vmax**2 / (2 * a_acc) - vmax**2 / (2 * a_dec), 0.0
+    )
+    trap = vmax / a_acc + vmax / a_dec + d_const / vmax
+    return np.where(v_peak <= vmax, tri, trap)
 
-def travel_time(load, origin_floor, destination_floor):
-    """Compute travel duration between floors (triangular/trapezoidal profile) / 计算楼层间行程时间（考虑三角或梯形速度曲线）。"""
-    distance = abs(destination_floor - origin_floor) * cfg.BUILDING_FLOOR_HEIGHT
-    direction = "up" if destination_floor > origin_floor else "down"
 
-    vmax = vmax_up(load) if direction == "up" else vmax_down(load)
-    a_acc = acc(load)
-    a_dec = dec(load)
+# travel_time is pure in (load, origin, destination), so repeated legs across
+# candidates and replays are memoised / 行程时间为纯函数，重复调用直接命中缓存。
+travel_time = lru_cache(maxsize=4096)(_tt_core)
 
-    v_peak = math.sqrt(2 * distance * a_acc * a_dec / (a_acc + a_dec))
 
-    if v_peak <= vmax:  # triangular profile / 三角速度曲线
-        return v_peak * (1 / a_acc + 1 / a_dec)
-    else:  # trapezoidal profile / 梯形速度曲线
-        d_acc = vmax**2 / (2 * a_acc)
-        d_dec = vmax**2 / (2 * a_dec)
-        d_const = max(distance - d_acc - d_dec, 0)
-        return vmax / a_acc + vmax / a_dec + d_const / vmax
+def cache_clear():
+    """Drop memoised travel times (test isolation) / 清空行程时间缓存（便于测试隔离）。"""
+    travel_time.cache_clear()
@@ -0,0 +1,102 @@
+import math
+
+from models import config as cfg
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - numba is optional / numba 为可选依赖
+
+    def njit(*args, **kwargs):
+        """Fallback no-op decorator when numba is missing / 缺少 numba 时的空装饰器。"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# Eager signature: compiled (or loaded from cache) at import, no type inference
+# on the first call. Floors are f8 so fractional floors are not truncated;
+# integer floors convert exactly. / 显式签名：导入时即编译或加载缓存，首次调用无需
+# 类型推断。楼层取 f8，小数楼层不会被截断，整数楼层转换无误差。
+_TRAVEL_TIME_SIG = "f8(f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8)"
+
+
+@njit(_TRAVEL_TIME_SIG, cache=True)
+def _travel_time_nb(
+    load, o, d, H, capacity, vuf, vue, vdf, vde, k_s, auf, aue, k_a, duf, due, square
+):
+    """JIT kernel mirroring models.kinematics / 与 models.kinematics 一致的 JIT 内核。"""
+    distance = abs(d - o) * H
+    speed_decay = math.exp(-k_s * load / capacity)
+    acc_decay = math.exp(-k_a * load / capacity)
+
+    if d > o:
+        vmax = vuf + (vue - vuf) * speed_decay
+    else:
+        vmax = vdf + (vde - vdf) * speed_decay
+    a_acc = auf + (aue - auf) * acc_decay
+    a_dec = duf + (due - duf) * acc_decay
+
+    v_peak = math.sqrt(2 * distance * a_acc * a_dec / (a_acc + a_dec))
+
+    if v_peak <= vmax:  # triangular profile / 三角速度曲线
+        return v_peak * (1 / a_acc + 1 / a_dec)
+    # trapezoidal profile / 梯形速度曲线
+    d_acc = vmax**square / (2 * a_acc)
+    d_dec = vmax**square / (2 * a_dec)
+    d_const = max(distance - d_acc - d_dec, 0.0)
+    return vmax / a_acc + vmax / a_dec + d_const / vmax
+
+
+_H = float(cfg.BUILDING_FLOOR_HEIGHT)
+_CAPACITY = float(cfg.ELEVATOR_CAPACITY)
+_VUF = float(cfg.KIN_MAX_SPEED_UP_FULL)
+_VUE = float(cfg.KIN_MAX_SPEED_UP_EMPTY)
+_VDF = float(cfg.KIN_MAX_SPEED_DOWN_FULL)
+_VDE = float(cfg.KIN_MAX_SPEED_DOWN_EMPTY)
+_K_S = float(cfg.KIN_SPEED_DECAY_RATE)
+_AUF = float(cfg.KIN_ACC_UP_FULL)
+_AUE = float(cfg.KIN_ACC_UP_EMPTY)
+_K_A = float(cfg.KIN_ACC_DECAY_RATE)
+_DUF = float(cfg.KIN_DEC_DOWN_FULL)
+_DUE = float(cfg.KIN_DEC_DOWN_EMPTY)
+# Passed at run time: LLVM folds a literal `x**2` into `x*x`, which can differ
+# from CPython's libm pow by one ulp.
+# 运行时传入：LLVM 会把字面量 `x**2` 折叠为 `x*x`，与 CPython 的 pow 可能相差 1 ulp。
+_SQUARE = 2.0
+
+
+def travel_time(load, origin_floor, destination_floor):
+    """Compute travel duration between floors (JIT) / 计算楼层间行程时间（JIT 加速）。"""
+    return _travel_time_nb(
+        load,
+        origin_floor,
+        destination_floor,
+        _H,
+        _CAPACITY,
+        _VUF,
+        _VUE,
+        _VDF,
+        _VDE,
+        _K_S,
+        _AUF,
+        _AUE,
+        _K_A,
+        _DUF,
+        _DUE,
+        _SQUARE,
+    )
+
+
+"""
+Fast kinematics / 快速运动学
+----------------------------
+
+EN: Numba-compiled travel-time kernel equivalent to `models.kinematics`.
+The kernel has an eager signature, so it compiles (or loads from the disk
+cache) at import. Config constants are bound once at import; falls back to
+plain Python when numba is not installed.
+
+ZH: 与 `models.kinematics` 等价的 Numba 编译行程时间内核。配置常量在导入时
+一次性绑定；内核带显式签名，导入时即完成编译或加载磁盘缓存；若未安装 numba
+则退化为纯 Python 实现。
+"""
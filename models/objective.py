@@ -2,9 +2,11 @@ from dataclasses import dataclass
 import heapq
 import math
 
+import numpy as np
+
 from models import config as cfg
-from models.energy import segment_energy
-from models.kinematics import travel_time
+from models.energy import segment_energy_vec
+from models.kinematics import travel_time_vec
 
 
 WAIT_PENALTY_SCALE = cfg.WAIT_PENALTY_SCALE
@@ -12,6 +14,14 @@ WAIT_PENALTY_EXPONENT = cfg.WAIT_PENALTY_EXPONENT
 WAIT_PENALTY_THRESHOLD = cfg.WAIT_PENALTY_THRESHOLD
 EMPTYLOAD_PENALTY_MULTIPLIER = cfg.EMPTYLOAD_PENALTY_MULTIPLIER
 
+# Config constants resolved once at import / 导入时解析的配置常量
+_WT = cfg.WEIGHT_TIME
+_WE = cfg.WEIGHT_ENERGY
+_ZERO_WAIT_BONUS = cfg.ZERO_WAIT_BONUS
+_EMPTYLOAD_EXTRA = max(EMPTYLOAD_PENALTY_MULTIPLIER - 1.0, 0.0)
+_H = cfg.BUILDING_FLOOR_HEIGHT
+_ELEVATOR_COUNT = max(int(cfg.ELEVATOR_COUNT), 1)
+
 
 @dataclass
 class PassengerMetrics:
@@ -32,78 +42,130 @@ class ObjectiveBreakdown:
     emptyload_energy_cost: float
 
 
-def wait_penalty(wait_time: float) -> float:
+# Normalised penalty constants, resolved once at import / 导入时一次性归一化的惩罚常量
+_INV_SCALE = 1.0 / max(WAIT_PENALTY_SCALE, 1e-6)
+_EXP = max(WAIT_PENALTY_EXPONENT, 1.0)
+_THR = max(WAIT_PENALTY_THRESHOLD, 0.0)
+
+
+def _make_wait_penalty(threshold: float, inv_scale: float, exponent: float):
     """
-    Piecewise (truncated) super-linear penalty for passenger waiting time.
-    仅当等待时间超过阈值时施加额外非线性惩罚。
-
-    参数:
-        wait_time : 等待时间 (s)
-    超参:
-        WAIT_PENALTY_SCALE     - 时间归一化尺度 (s)
-        WAIT_PENALTY_EXPONENT  - 非线性指数 (>1)
-        WAIT_PENALTY_THRESHOLD - 开始施加非线性惩罚的阈值 (s)
+    Specialise wait_penalty for resolved constants / 按已解析常量特化 wait_penalty。
+    常量作为闭包变量绑定，热路径中不再查找模块全局或调用 max()。
     """
-    if wait_time <= 0.0:
-        return 0.0
+    if threshold == 0.0:
+
+        def wait_penalty(wait_time: float) -> float:
+            """Super-linear wait penalty (zero threshold) / 阈值为 0 的超线性等待惩罚。"""
+            excess = wait_time if wait_time > 0.0 else 0.0
+            return excess * (1.0 + (excess * inv_scale) ** exponent)
+
+        return wait_penalty
+
+    def wait_penalty(wait_time: float) -> float:
+        """
+        Piecewise (truncated) super-linear penalty for passenger waiting time.
+        仅当等待时间超过阈值时施加额外非线性惩罚。
+
+        参数:
+            wait_time : 等待时间 (s)
+        超参:
+            WAIT_PENALTY_SCALE     - 时间归一化尺度 (s)
+            WAIT_PENALTY_EXPONENT  - 非线性指数 (>1)
+            WAIT_PENALTY_THRESHOLD - 开始施加非线性惩罚的阈值 (s)
+        """
+        if wait_time <= 0.0:
+            return 0.0
+
+        if wait_time <= threshold:
+            # 阈值以下 → 线性惩罚（可直接等同于时间本身）
+            return wait_time
+        else:
+            # 超过阈值部分施加非线性放大
+            excess = wait_time - threshold
+            nonlinear_penalty = excess * (1.0 + (excess * inv_scale) ** exponent)
+            return threshold + nonlinear_penalty
 
-    scale = max(WAIT_PENALTY_SCALE, 1e-6)
-    exponent = max(WAIT_PENALTY_EXPONENT, 1.0)
-    threshold = max(WAIT_PENALTY_THRESHOLD, 0.0)
+    return wait_penalty
 
-    if wait_time <= threshold:
-        # 阈值以下 → 线性惩罚（可直接等同于时间本身）
-        return wait_time
-    else:
-        # 超过阈值部分施加非线性放大
-        excess = wait_time - threshold
-        normalized = excess / scale
-        nonlinear_penalty = excess * (1.0 + normalized**exponent)
-        return threshold + nonlinear_penalty
+
+wait_penalty = _make_wait_penalty(_THR, _INV_SCALE, _EXP)
 
 
-def summarize_passenger_metrics(served_requests) -> PassengerMetrics:
+def _make_power_vec(exponent: float):
+    """
+    Pick the array power for the resolved exponent / 按已解析指数选择数组幂运算。
+    Only fast paths bit-identical to `**` are used (1 and 2); forms such as
+    x*sqrt(x) round twice / 仅保留与 `**` 逐位一致的快速路径（1 与 2），
+    x*sqrt(x) 等写法会引入二次舍入。
+    """
+    if exponent == 1.0:
+        return lambda ratio: ratio
+    if exponent == 2.0:
+        return lambda ratio: ratio * ratio
+    return lambda ratio: ratio**exponent
+
+
+_power_vec = _make_power_vec(_EXP)
+
+
+def wait_penalty_vec(waits: np.ndarray) -> np.ndarray:
+    """Vectorised wait_penalty over non-negative waits / 非负等待时间的向量化惩罚。"""
+    excess = np.maximum(waits - _THR, 0.0)
+    return np.where(
+        waits > _THR, _THR + excess * (1.0 + _power_vec(excess * _INV_SCALE)), waits
+    )
+
+
+def summarize_passenger_metrics(
+    served_requests,
+) -> tuple[PassengerMetrics, np.ndarray]:
     """
     Aggregate passenger-centric statistics / 汇总乘客相关指标。
-    返回乘客总时间、等待、轿厢内时间、惩罚值以及服务数量。
+    返回乘客总时间、等待、轿厢内时间、惩罚值以及服务数量，
+    并在同一遍历中给出每个请求的等待时间序列（用于分布图）。
     """
-    total_passenger_time = 0.0
-    total_wait_time = 0.0
-    total_in_cab_time = 0.0
-    total_wait_penalty = 0.0
-    served_count = 0
-    zero_wait_count = 0
-
-    for req in served_requests:
-        arr = getattr(req, "arrival_time", None)
-        origin_arrival = getattr(req, "origin_arrival_time", None)
-        dest_arrival = getattr(req, "destination_arrival_time", None)
-
-        if arr is None or dest_arrival is None:
-            continue
+    # None → NaN, one (arrival, origin_arrival, dest_arrival, pickup) row per request
+    times = np.array(
+        [
+            (
+                req.arrival_time,
+                req.origin_arrival_time,
+                req.destination_arrival_time,
+                req.pickup_time,
+            )
+            for req in served_requests
+        ],
+        dtype=np.float64,
+    ).reshape(-1, 4)
+    arr, origin_arrival, dest_arrival, pickup = times.T
+
+    # Wait series: boarding falls back to pickup / 等待序列：上车时刻缺失时退回 pickup
+    boarding = np.where(np.isnan(origin_arrival), pickup, origin_arrival)
+    has_boarding = ~np.isnan(arr) & ~np.isnan(boarding)
+    wait_times = np.maximum(boarding[has_boarding] - arr[has_boarding], 0.0)
+
+    served = ~np.isnan(arr) & ~np.isnan(dest_arrival)
+    arr = arr[served]
+    origin_arrival = origin_arrival[served]
+    dest_arrival = dest_arrival[served]
+
+    trip_total = np.maximum(dest_arrival - arr, 0.0)
+    boarded = ~np.isnan(origin_arrival)
+    waits = np.maximum(origin_arrival[boarded] - arr[boarded], 0.0)
+    in_cab = np.where(
+        boarded, np.maximum(dest_arrival - origin_arrival, 0.0), trip_total
+    )
 
-        served_count += 1
-        trip_total = max(dest_arrival - arr, 0.0)
-        total_passenger_time += trip_total
-
-        if origin_arrival is not None:
-            wait = max(origin_arrival - arr, 0.0)
-            total_wait_time += wait
-            total_wait_penalty += wait_penalty(wait)
-            total_in_cab_time += max(dest_arrival - origin_arrival, 0.0)
-            if wait <= 1e-9:
-                zero_wait_count += 1
-        else:
-            total_in_cab_time += trip_total
-
-    return PassengerMetrics(
-        total_passenger_time=total_passenger_time,
-        total_wait_time=total_wait_time,
-        total_in_cab_time=total_in_cab_time,
-        wait_penalty_total=total_wait_penalty,
-        served_count=served_count,
-        zero_wait_count=zero_wait_count,
+    metrics = PassengerMetrics(
+        total_passenger_time=float(trip_total.sum()),
+        total_wait_time=float(waits.sum()),
+        total_in_cab_time=float(in_cab.sum()),
+        wait_penalty_total=float(wait_penalty_vec(waits).sum()),
+        served_count=int(arr.shape[0]),
+        zero_wait_count=int(np.count_nonzero(waits <= 1e-9)),
     )
+    return metrics, wait_times
 
 
 def compute_objective(
@@ -111,9 +173,13 @@ def compute_objective(
     in_cab_time: float,
     emptyload_energy: float,
     running_energy: float,
+    wait_penalty_value: float,
     *,
-    wait_penalty_value: float | None = None,
     zero_wait_count: int = 0,
+    _WT=_WT,
+    _WE=_WE,
+    _ZERO_WAIT_BONUS=_ZERO_WAIT_BONUS,
+    _EMPTYLOAD_EXTRA=_EMPTYLOAD_EXTRA,
 ) -> ObjectiveBreakdown:
     """
     Compute weighted losses for waiting, riding, and energy usage /
@@ -125,19 +191,17 @@ def compute_objective(
     in_cab_time: cumulative in-cab time in seconds / 乘客乘坐总时间（秒）。
     emptyload_energy: energy spent running empty (J) / 空载行驶能耗（焦耳）。
     running_energy: total traction + standby energy (J) / 总牵引加待机能耗（焦耳）。
+    wait_penalty_value: aggregated wait penalty (PassengerMetrics.wait_penalty_total)
+        / 汇总后的等待惩罚。
     """
-    wait_penalty_value = (
-        wait_penalty(wait_time) if wait_penalty_value is None else wait_penalty_value
-    )
-    wait_cost = cfg.WEIGHT_TIME * wait_penalty_value
+    wait_cost = _WT * wait_penalty_value
     # 奖励：当等待时间为 0 的请求个数为 zero_wait_count 时，减少一部分等待成本
-    if zero_wait_count > 0 and cfg.ZERO_WAIT_BONUS > 0.0:
-        bonus = cfg.ZERO_WAIT_BONUS * float(zero_wait_count)
+    if zero_wait_count > 0 and _ZERO_WAIT_BONUS > 0.0:
+        bonus = _ZERO_WAIT_BONUS * float(zero_wait_count)
         wait_cost = max(0.0, wait_cost - bonus)
-    ride_cost = cfg.WEIGHT_TIME * in_cab_time
-    running_energy_cost = cfg.WEIGHT_ENERGY * running_energy
-    extra_multiplier = max(EMPTYLOAD_PENALTY_MULTIPLIER - 1.0, 0.0)
-    emptyload_energy_cost = cfg.WEIGHT_ENERGY * emptyload_energy * extra_multiplier
+    ride_cost = _WT * in_cab_time
+    running_energy_cost = _WE * running_energy
+    emptyload_energy_cost = _WE * emptyload_energy * _EMPTYLOAD_EXTRA
 
     total_cost = wait_cost + ride_cost + running_energy_cost + emptyload_energy_cost
 
@@ -202,28 +266,27 @@ def compute_theoretical_limit(
     一致的 SRPT 理论下界，等待惩罚通过 Jensen 不等式估计总和下界。
     """
 
-    jobs = []
-    total_in_cab_time = 0.0
-    min_running_energy = 0.0  # 牵引能耗下界
-
+    trips = []
     for req in requests:
-        origin = getattr(req, "origin", None)
-        destination = getattr(req, "destination", None)
-        if origin is None or destination is None or origin == destination:
+        if req.origin == req.destination:
             continue
+        trips.append((req.origin, req.destination, req.load, req.arrival_time))
 
-        load = getattr(req, "load", 0.0)
-        arrival_time = getattr(req, "arrival_time", getattr(req, "arrival", 0.0))
-        ride_time = max(travel_time(load, origin, destination), 0.0)
+    # SoA layout: one float64 column per field / 按字段列存储
+    trip_arr = np.array(trips, dtype=np.float64).reshape(-1, 4)
+    origins, dests, loads, arrivals = trip_arr.T
 
-        total_in_cab_time += ride_time
-        jobs.append((arrival_time, ride_time))
+    ride_times = np.maximum(travel_time_vec(loads, origins, dests), 0.0)
+    total_in_cab_time = float(ride_times.sum())
+    jobs = list(zip(arrivals.tolist(), ride_times.tolist()))
 
-        distance = abs(destination - origin) * cfg.BUILDING_FLOOR_HEIGHT
-        direction = "up" if destination > origin else "down"
-        min_running_energy += segment_energy(load, distance, direction)
+    # 牵引能耗下界 / traction energy lower bound
+    distances = np.abs(dests - origins) * _H
+    min_running_energy = float(
+        segment_energy_vec(loads, distances, dests > origins).sum()
+    )
 
-    elevator_count = max(int(cfg.ELEVATOR_COUNT), 1)
+    elevator_count = _ELEVATOR_COUNT
     service_rate = max(float(elevator_count), 1e-9)
     flow_lb = _srpt_flow_lb_speed_c(jobs, elevator_count)
     total_service = sum(s for _, s in jobs)
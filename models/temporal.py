@@ -10,22 +10,35 @@ ZH: 基于上下客重量估计开门停站时间，通过两段斜率刻画正
 
 from models import config as cfg
 
+# Config constants resolved once at import / 导入时解析的配置常量
+_HOLD_BASE = cfg.HOLD_BASE_TIME
+_HOLD_NORMAL = cfg.HOLD_EFF_NORMAL
+_HOLD_CONGESTED = cfg.HOLD_EFF_CONGESTED
+_HOLD_THRESHOLD = cfg.HOLD_CONGESTION_THRESHOLD
 
-def hold_time(boarding_weight, alighting_weight):
+
+def hold_time(
+    boarding_weight,
+    alighting_weight,
+    _HOLD_BASE=_HOLD_BASE,
+    _HOLD_NORMAL=_HOLD_NORMAL,
+    _HOLD_CONGESTED=_HOLD_CONGESTED,
+    _HOLD_THRESHOLD=_HOLD_THRESHOLD,
+):
     """Door dwell vs passenger mass / 停站时间与客流重量。
 
     EN: Below the congestion threshold, time scales with total mass using the
-    normal slope; the excess beyond threshold uses the congested slope.
+    normal slope; the excess beyond threshold uses the congested slope. Written
+    in closed form with min/max so it carries no branch.
 
     ZH: 当总重量不超过拥挤阈值时按“正常斜率”增长；超过部分按“拥挤斜率”增长。
+    以 min/max 闭式表达，无分支。
     """
     total_weight = boarding_weight + alighting_weight
-    if total_weight <= cfg.HOLD_CONGESTION_THRESHOLD:
-        return cfg.HOLD_BASE_TIME + cfg.HOLD_EFF_NORMAL * total_weight
-    else:
-        normal_part = cfg.HOLD_EFF_NORMAL * cfg.HOLD_CONGESTION_THRESHOLD
-        # 超出阈值部分按拥挤系数计算 / congested segment beyond threshold
-        congested_part = cfg.HOLD_EFF_CONGESTED * (
-            total_weight - cfg.HOLD_CONGESTION_THRESHOLD
-        )
-        return cfg.HOLD_BASE_TIME + normal_part + congested_part
+    # 超出阈值部分按拥挤系数计算 / congested segment beyond threshold
+    return (
+        _HOLD_BASE
+        + _HOLD_NORMAL * min(total_weight, _HOLD_THRESHOLD)
+        + _HOLD_CONGESTED * max(total_weight - _HOLD_THRESHOLD, 0.0)
+    )
+
@@ -5,6 +5,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Sequence, Tuple
 
+import numpy as np
 
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 _RESULTS_DIR = _PROJECT_ROOT / "results"
@@ -278,16 +279,19 @@ def plot_wait_distribution(
 ) -> None:
     """
     Plot wait-time histograms for multiple strategies / 绘制多策略等待时间分布直方图。
-    wait_data expects (label, waits) pairs / 输入为 (策略名称, 等待时间序列)。
+    wait_data expects (label, waits) pairs; waits may be a NumPy array /
+    输入为 (策略名称, 等待时间序列)，序列可为 NumPy 数组。
     """
     plt = _ensure_matplotlib()
     if plt is None:
         return
 
-    series = [
-        (label, [w for w in waits if w is not None]) for label, waits in wait_data
-    ]
-    series = [(label, waits) for label, waits in series if waits]
+    series = []
+    for label, waits in wait_data:
+        if not isinstance(waits, np.ndarray):
+            waits = np.array([w for w in waits if w is not None], dtype=np.float64)
+        if waits.size:
+            series.append((label, waits))
 
     if not series:
         print("[Plot Skipped] No wait-time data available.")
@@ -1,13 +1,18 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(slots=True)
 class Request:
     id: int
     origin: int
     destination: int
     load: float
     arrival_time: float
+    # Filled in by the simulator / 由仿真器回填的调度时刻
+    pickup_time: float | None = None
+    dropoff_time: float | None = None
+    origin_arrival_time: float | None = None
+    destination_arrival_time: float | None = None
     """Passenger request / 乘客请求。
 
     EN: A single hall+car call represented as origin, destination, load (kg),
@@ -17,12 +22,19 @@ class Request:
     """
 
 
-@dataclass
+@dataclass(slots=True)
 class ElevatorState:
     id: int
     floor: int
     load: float = 0.0
     direction: str = "idle"  # "up", "down", or "idle"
+    queue: list = field(default_factory=list)
+    served_requests: list = field(default_factory=list)
+    initial_floor: int | None = None
+    # Scratch slot for the greedy baseline / 贪婪基线的临时预测楼层
+    _forecast_floor: int | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
     """Elevator state / 电梯状态。
 
     EN: Minimal state for scheduling decisions: current floor, load and
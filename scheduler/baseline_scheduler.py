@@ -91,9 +91,8 @@ def simulate_dispatch(elevators):
 
             load = current_load()
             travel_duration = travel_time(load, start_floor, end_floor)
-            direction = "up" if end_floor > start_floor else "down"
             distance = abs(end_floor - start_floor) * cfg.BUILDING_FLOOR_HEIGHT
-            energy_motion = segment_energy(load, distance, direction)
+            energy_motion = segment_energy(load, distance, end_floor > start_floor)
             energy_idle = standby_energy(travel_duration)
 
             current_time += travel_duration
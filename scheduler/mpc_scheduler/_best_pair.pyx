@@ -0,0 +1,76 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+
+from libc.math cimport INFINITY
+
+
+cpdef tuple best_pair(
+    const double[:, :] cost,
+    const double[:, :] finish,
+    const double[:, :] passenger,
+    Py_ssize_t tie_cursor,
+    double eps,
+):
+    """Lexicographic (candidate, elevator) pick (compiled) / 字典序择优（编译版）。"""
+    cdef Py_ssize_t n_cand = cost.shape[0]
+    cdef Py_ssize_t n_elev = cost.shape[1]
+    cdef Py_ssize_t c, e, best_c = 0, best_e = 0, rotation, best_rotation = n_elev
+    cdef Py_ssize_t tied = 0
+    cdef double cost_cut, finish_cut, passenger_cut
+    cdef double min_cost = INFINITY, min_finish = INFINITY, min_passenger = INFINITY
+
+    with nogil:
+        for c in range(n_cand):
+            for e in range(n_elev):
+                if cost[c, e] < min_cost:
+                    min_cost = cost[c, e]
+        cost_cut = min_cost + eps
+
+        for c in range(n_cand):
+            for e in range(n_elev):
+                if cost[c, e] <= cost_cut and finish[c, e] < min_finish:
+                    min_finish = finish[c, e]
+        finish_cut = min_finish + eps
+
+        for c in range(n_cand):
+            for e in range(n_elev):
+                if (
+                    cost[c, e] <= cost_cut
+                    and finish[c, e] <= finish_cut
+                    and passenger[c, e] < min_passenger
+                ):
+                    min_passenger = passenger[c, e]
+        passenger_cut = min_passenger + eps
+
+        # 轮转最近的电梯优先，其次为最靠前的候选 / nearest elevator after the
+        # cursor first, then the earliest candidate
+        for c in range(n_cand):
+            for e in range(n_elev):
+                if (
+                    cost[c, e] <= cost_cut
+                    and finish[c, e] <= finish_cut
+                    and passenger[c, e] <= passenger_cut
+                ):
+                    tied += 1
+                    rotation = (e - tie_cursor) % n_elev
+                    if rotation < best_rotation:
+                        best_rotation = rotation
+                        best_c = c
+                        best_e = e
+
+    return best_c, best_e, tied > 1
+
+"""
+Compiled best-pair pick / 编译版最优组合选择
+-------------------------------------------
+
+EN: Cython build of `_pick_lexicographic` in the MPC scheduler: the same eps
+bands on cost, finish and passenger time and the same rotating-elevator
+tie-break, in four passes over the grid without temporary arrays. Build in
+place with `cythonize -i scheduler/mpc_scheduler/_best_pair.pyx`; the scheduler
+falls back to the NumPy version when the extension is not built.
+
+ZH: MPC 调度器中 `_pick_lexicographic` 的 Cython 实现：代价、完成时间、乘客时间
+采用相同的 eps 容差与电梯轮转平局规则，四次遍历网格且不产生临时数组。使用
+`cythonize -i scheduler/mpc_scheduler/_best_pair.pyx` 原地编译；未编译时调度器
+自动退回 NumPy 实现。
+"""
@@ -96,6 +96,9 @@ class DestinationLogisticModel:
         )
         self._classes = np.arange(self.num_floors, dtype=np.int32)
         self._trained = False
+        # Bumped whenever the weights change, so cached predictions can tell
+        # a refit model apart / 权重每次更新时递增，便于缓存识别模型已重新拟合
+        self.fit_count = 0
 
     # ------------------------------------------------------------------ #
     # Hyper-parameter control
@@ -158,6 +161,7 @@ class DestinationLogisticModel:
             self._trained = True
         else:
             self._clf.partial_fit(X, y)
+        self.fit_count += 1
 
     def train(self, epochs: int | None = None) -> TrainingResult | None:
         if not self._trained:
@@ -181,6 +185,7 @@ class DestinationLogisticModel:
                 self._trained = True
             else:
                 self._clf.partial_fit(X, y)
+        self.fit_count += 1
         loss = self._compute_log_loss(X, y)
         return TrainingResult(epochs=epochs_to_run, final_loss=loss, total_samples=X.shape[0])
 
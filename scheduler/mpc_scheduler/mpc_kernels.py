@@ -0,0 +1,402 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from models import config as cfg
+from models.kinematics_fast import _SQUARE, _travel_time_nb, njit
+
+try:
+    from numba import carray, cfunc, prange, types
+except ImportError:  # pragma: no cover - numba is optional / numba 为可选依赖
+    cfunc = None
+    prange = range
+
+# Config constants bundled once at import and passed to the kernels, so a
+# cached compilation never bakes in stale values.
+# 配置常量在导入时打包后作为参数传入内核，避免编译缓存固化过期取值。
+_KIN = (
+    float(cfg.BUILDING_FLOOR_HEIGHT),
+    float(cfg.ELEVATOR_CAPACITY),
+    float(cfg.KIN_MAX_SPEED_UP_FULL),
+    float(cfg.KIN_MAX_SPEED_UP_EMPTY),
+    float(cfg.KIN_MAX_SPEED_DOWN_FULL),
+    float(cfg.KIN_MAX_SPEED_DOWN_EMPTY),
+    float(cfg.KIN_SPEED_DECAY_RATE),
+    float(cfg.KIN_ACC_UP_FULL),
+    float(cfg.KIN_ACC_UP_EMPTY),
+    float(cfg.KIN_ACC_DECAY_RATE),
+    float(cfg.KIN_DEC_DOWN_FULL),
+    float(cfg.KIN_DEC_DOWN_EMPTY),
+    _SQUARE,
+)
+_HOLD = (
+    float(cfg.HOLD_BASE_TIME),
+    float(cfg.HOLD_EFF_NORMAL),
+    float(cfg.HOLD_EFF_CONGESTED),
+    float(cfg.HOLD_CONGESTION_THRESHOLD),
+)
+_ENERGY = (
+    float(cfg.ENERGY_CAR_MASS),
+    float(cfg.ENERGY_COUNTERWEIGHT_MASS),
+    float(cfg.ENERGY_FRICTION_PER_METER),
+    max(float(cfg.ENERGY_MOTOR_EFFICIENCY), 1e-9),
+    float(cfg.ENERGY_STANDBY_POWER),
+)
+_WEIGHTS = (float(cfg.WEIGHT_TIME), float(cfg.WEIGHT_ENERGY))
+
+# Eager signatures: every kernel compiles (or loads from cache) at import, and
+# internal-only kernels skip the CPython wrapper.
+# 显式签名：各内核在导入时编译或加载缓存；仅供内部调用的内核不生成 CPython 包装。
+_KIN_T = "UniTuple(f8, 13)"
+_HOLD_T = "UniTuple(f8, 4)"
+_ENERGY_T = "UniTuple(f8, 5)"
+_WEIGHTS_T = "UniTuple(f8, 2)"
+_INTERNAL = {"cache": True, "no_cpython_wrapper": True}
+_GRID_T = "f8[:, ::1], f8[:, ::1], f8[:, ::1], f8[:, :, ::1], i8[::1], f8[:, :, ::1]"
+
+# Below this many cells the thread start-up costs more than the fill itself.
+# 单元格数低于该值时，线程启动开销超过填充本身，改用串行版本。
+PARALLEL_MIN_CELLS = 64
+
+
+@njit(f"f8(f8, i8, i8, {_KIN_T})", **_INTERNAL)
+def _travel_time(load, origin_floor, destination_floor, kin):
+    """Travel duration between floors / 楼层间行程时间。"""
+    h, cap, vuf, vue, vdf, vde, k_s, auf, aue, k_a, duf, due, square = kin
+    return _travel_time_nb(
+        load,
+        origin_floor,
+        destination_floor,
+        h,
+        cap,
+        vuf,
+        vue,
+        vdf,
+        vde,
+        k_s,
+        auf,
+        aue,
+        k_a,
+        duf,
+        due,
+        square,
+    )
+
+
+@njit(f"f8(f8, f8, {_HOLD_T})", **_INTERNAL)
+def _hold_time(boarding_weight, alighting_weight, hold):
+    """Door dwell vs passenger mass (models.temporal) / 停站时间（同 models.temporal）。"""
+    base, normal, congested, threshold = hold
+    total_weight = boarding_weight + alighting_weight
+    return (
+        base
+        + normal * min(total_weight, threshold)
+        + congested * max(total_weight - threshold, 0.0)
+    )
+
+
+@njit(f"f8(f8, {_ENERGY_T})", **_INTERNAL)
+def _standby_energy(duration, energy):
+    """Standby energy over a duration / 时长内的待机能耗。"""
+    return energy[4] * max(duration, 0.0)
+
+
+@njit("f8(f8)", **_INTERNAL)
+def _positive(value):
+    return value if value > 0.0 else 0.0
+
+
+@njit(f"f8(f8, f8, i8, {_KIN_T}, {_ENERGY_T})", **_INTERNAL)
+def _segment_energy(load, distance, dir_sign, kin, energy):
+    """Segment energy, dir_sign +1 up / -1 down / 分段能耗（同 models.energy）。"""
+    if distance <= 0:
+        return 0.0
+
+    _, cap, vuf, vue, vdf, vde, k_s, auf, aue, k_a, duf, due, square = kin
+    car_mass, counterweight_mass, friction, eff, _ = energy
+    g = 9.81
+
+    speed_decay = math.exp(-k_s * load / cap)
+    acc_decay = math.exp(-k_a * load / cap)
+    if dir_sign > 0:
+        vmax = vuf + (vue - vuf) * speed_decay
+    else:
+        vmax = vdf + (vde - vdf) * speed_decay
+    a_acc = max(auf + (aue - auf) * acc_decay, 1e-9)
+    a_dec = max(duf + (due - duf) * acc_decay, 1e-9)
+
+    v_peak_tri = math.sqrt(
+        max(2.0 * distance * a_acc * a_dec / max(a_acc + a_dec, 1e-9), 0.0)
+    )
+
+    if v_peak_tri <= vmax + 1e-9:
+        v_peak = v_peak_tri
+        d_acc = v_peak**square / (2.0 * a_acc)
+        d_dec = v_peak**square / (2.0 * a_dec)
+        d_const = 0.0
+    else:
+        v_peak = vmax
+        d_acc = v_peak**square / (2.0 * a_acc)
+        d_dec = v_peak**square / (2.0 * a_dec)
+        d_const = max(distance - d_acc - d_dec, 0.0)
+
+    M_eq = car_mass + load
+    delta_mass = (car_mass + load) - counterweight_mass
+
+    e_acc = (
+        _positive(
+            0.5 * M_eq * v_peak**square
+            + dir_sign * g * delta_mass * d_acc
+            + friction * d_acc
+        )
+        / eff
+    )
+    e_const = _positive(dir_sign * g * delta_mass * d_const + friction * d_const) / eff
+    e_dec = (
+        _positive(
+            -0.5 * M_eq * v_peak**square
+            + dir_sign * g * delta_mass * d_dec
+            + friction * d_dec
+        )
+        / eff
+    )
+    return e_acc + e_const + e_dec
+
+
+@njit(
+    f"Tuple((f8, f8, f8))(i8, f8, i8, i8, f8, f8, {_KIN_T}, {_HOLD_T}, {_ENERGY_T},"
+    f" {_WEIGHTS_T})",
+    cache=True,
+)
+def _estimate(
+    current_floor,
+    available_time,
+    origin,
+    destination,
+    load,
+    arrival_time,
+    kin,
+    hold,
+    energy_params,
+    weights,
+):
+    """(cost, finish_time, passenger_time) for one destination / 单一目的地的代价三元组。"""
+    floor_height = kin[0]
+    w_time, w_energy = weights
+
+    travel_to_origin = _travel_time(0.0, current_floor, origin, kin)
+    arrival_at_origin = available_time + travel_to_origin
+    start_service = max(arrival_at_origin, arrival_time)
+    dwell = _hold_time(load, 0.0, hold)
+    depart_time = start_service + dwell
+    travel_to_dest = _travel_time(load, origin, destination, kin)
+    finish_time = depart_time + travel_to_dest
+
+    passenger_time = finish_time - arrival_time
+
+    energy = 0.0
+    if current_floor != origin:
+        distance = abs(current_floor - origin) * floor_height
+        dir_sign = 1 if origin > current_floor else -1
+        energy += _segment_energy(0.0, distance, dir_sign, kin, energy_params)
+        energy += _standby_energy(travel_to_origin, energy_params)
+
+    if dwell > 0.0:
+        energy += _standby_energy(dwell, energy_params)
+
+    if origin != destination:
+        distance = abs(destination - origin) * floor_height
+        dir_sign = 1 if destination > origin else -1
+        energy += _segment_energy(load, distance, dir_sign, kin, energy_params)
+        energy += _standby_energy(travel_to_dest, energy_params)
+
+    total_cost = w_time * passenger_time + w_energy * energy
+    total_cost += 1e-6 * finish_time
+
+    return total_cost, finish_time, passenger_time
+
+
+@njit(f"void(i8, {_GRID_T}, {_WEIGHTS_T})", **_INTERNAL)
+def _fill_row(i, at_origin, empty_energy, terms, rides, cols, costs, weights):
+    """Expected costs of grid row i over the given columns / 网格第 i 行的期望代价。"""
+    w_time, w_energy = weights
+    arrival, dwell, dwell_energy = terms[i, 0], terms[i, 1], terms[i, 2]
+    for j in range(cols.shape[0]):
+        depart_time = max(at_origin[i, j], arrival) + dwell
+        base_energy = empty_energy[i, j] + dwell_energy
+        expected_cost = 0.0
+        expected_finish = 0.0
+        expected_passenger = 0.0
+        # Missing destination slots keep prob 0 and add exactly 0.0
+        # 空位概率为 0，贡献恰为 0.0
+        for k in range(rides.shape[2]):
+            finish_time = depart_time + rides[1, i, k]
+            passenger_time = finish_time - arrival
+            energy = base_energy + rides[2, i, k] + rides[3, i, k]
+            cost = w_time * passenger_time + w_energy * energy
+            cost = cost + 1e-6 * finish_time
+            expected_cost = expected_cost + rides[0, i, k] * cost
+            expected_finish = expected_finish + rides[0, i, k] * finish_time
+            expected_passenger = expected_passenger + rides[0, i, k] * passenger_time
+        costs[0, i, cols[j]] = expected_cost
+        costs[1, i, cols[j]] = expected_finish
+        costs[2, i, cols[j]] = expected_passenger
+
+
+@njit(f"void({_GRID_T}, {_WEIGHTS_T})", cache=True)
+def _fill_serial(at_origin, empty_energy, terms, rides, cols, costs, weights):
+    for i in range(at_origin.shape[0]):
+        _fill_row(i, at_origin, empty_energy, terms, rides, cols, costs, weights)
+
+
+# Compiled lazily, on the first wide grid: building a parallel kernel starts
+# the threading layer, and with TBB a fork afterwards (main.py's worker pool)
+# can hang at interpreter exit.
+# 首次遇到大网格时才编译：并行内核会启动线程层，使用 TBB 时之后再 fork（如
+# main.py 的进程池）可能导致解释器退出时挂起。
+@njit(cache=True, parallel=True)
+def _fill_parallel(at_origin, empty_energy, terms, rides, cols, costs, weights):
+    for i in prange(at_origin.shape[0]):
+        _fill_row(i, at_origin, empty_energy, terms, rides, cols, costs, weights)
+
+
+def fill_expected_costs(at_origin, empty_energy, terms, rides, cols, costs):
+    """
+    Write expected (cost, finish, passenger) cells into `costs` /
+    将期望（代价, 完成时间, 乘客时间）写入 `costs`。
+
+    EN: `at_origin` and `empty_energy` are (n_cand, len(cols)) empty-run
+    matrices, `terms` holds (arrival, dwell, dwell standby energy) per row and
+    `rides` is (prob/time/energy/standby, row, destination); results land in
+    `costs[:, :, cols]`. Rows are independent, so grids of at least
+    PARALLEL_MIN_CELLS cells are filled across threads; each cell is computed
+    by one thread in a fixed order, so the result does not depend on the
+    thread count.
+
+    ZH: `at_origin`、`empty_energy` 为（候选数, len(cols)）空载段矩阵，`terms`
+    为每行的（到达时刻, 停站时间, 停站待机能耗），`rides` 为（概率/时间/能耗/待机,
+    行, 目的地）；结果写入 `costs[:, :, cols]`。各行相互独立，单元格数不少于
+    PARALLEL_MIN_CELLS 时多线程填充；每个单元格由单一线程按固定顺序计算，结果与
+    线程数无关。
+    """
+    if cfunc is None:
+        _fill_numpy(at_origin, empty_energy, terms, rides, cols, costs, _WEIGHTS)
+        return
+    fill = _fill_parallel if at_origin.size >= PARALLEL_MIN_CELLS else _fill_serial
+    fill(at_origin, empty_energy, terms, rides, cols, costs, _WEIGHTS)
+
+
+def _fill_numpy(at_origin, empty_energy, terms, rides, cols, costs, weights):
+    """Element-wise fill when numba is missing, same order as `_fill_row` /
+    缺少 numba 时的逐元素填充，运算顺序与 `_fill_row` 相同。"""
+    w_time, w_energy = weights
+    arrival, dwell, dwell_energy = (column[:, None] for column in terms.T)
+    depart_time = np.maximum(at_origin, arrival) + dwell
+    base_energy = empty_energy + dwell_energy
+
+    expected_cost = np.zeros(at_origin.shape)
+    expected_finish = np.zeros(at_origin.shape)
+    expected_passenger = np.zeros(at_origin.shape)
+    for k in range(rides.shape[2]):
+        weight, ride_time, ride_energy, ride_standby = rides[:, :, k, None]
+        finish_time = depart_time + ride_time
+        passenger_time = finish_time - arrival
+        energy = base_energy + ride_energy + ride_standby
+        cost = w_time * passenger_time + w_energy * energy
+        cost = cost + 1e-6 * finish_time
+        expected_cost = expected_cost + weight * cost
+        expected_finish = expected_finish + weight * finish_time
+        expected_passenger = expected_passenger + weight * passenger_time
+
+    costs[0][:, cols] = expected_cost
+    costs[1][:, cols] = expected_finish
+    costs[2][:, cols] = expected_passenger
+
+
+def estimate_destination_cost(
+    current_floor, available_time, origin, destination, load, arrival_time
+):
+    """Cost triple for one destination (JIT) / 单一目的地的代价三元组（JIT 加速）。"""
+    return _estimate(
+        current_floor,
+        available_time,
+        origin,
+        destination,
+        load,
+        arrival_time,
+        _KIN,
+        _HOLD,
+        _ENERGY,
+        _WEIGHTS,
+    )
+
+
+@lru_cache(maxsize=None)
+def estimate_destination_cfunc():
+    """C-callable cost kernel, built on first use / 供 C 调用的代价内核（首次使用时编译）。
+
+    EN: `double f(int64 floor, double available, int64 origin, int64 destination,
+    double load, double arrival, double *out)` returns the cost and writes the
+    finish and passenger times to out[0] and out[1]. Hand `.address` to a C
+    extension or ctypes; config constants are frozen in when it is built.
+
+    ZH: 返回代价，并将完成时间与乘客时间写入 out[0]、out[1]。可将 `.address`
+    交给 C 扩展或 ctypes 使用；配置常量在编译时固化。
+    """
+    if cfunc is None:
+        raise RuntimeError("numba is required for the cfunc export / 导出 cfunc 需要 numba")
+
+    kin, hold, energy_params, weights = _KIN, _HOLD, _ENERGY, _WEIGHTS
+
+    @cfunc(
+        types.float64(
+            types.int64,
+            types.float64,
+            types.int64,
+            types.int64,
+            types.float64,
+            types.float64,
+            types.CPointer(types.float64),
+        )
+    )
+    def _estimate_c(
+        current_floor, available_time, origin, destination, load, arrival_time, out
+    ):
+        cost, finish_time, passenger_time = _estimate(
+            current_floor,
+            available_time,
+            origin,
+            destination,
+            load,
+            arrival_time,
+            kin,
+            hold,
+            energy_params,
+            weights,
+        )
+        times = carray(out, 2)
+        times[0] = finish_time
+        times[1] = passenger_time
+        return cost
+
+    return _estimate_c
+
+"""
+MPC kernels / MPC 计算内核
+-------------------------
+
+EN: Numba-compiled kernels for the MPC cost model: travel time, dwell,
+segment/standby energy, the per-destination cost triple and the expected-cost
+grid fill (threaded over rows for wide grids). Each mirrors the corresponding
+`models.*` function or NumPy expression operation by operation, so results are
+bit-identical. Kernels carry eager signatures and compile (or load from the
+disk cache) at import; `estimate_destination_cfunc` exposes the cost kernel to
+C callers. Falls back to plain Python when numba is not installed.
+
+ZH: MPC 代价模型的 Numba 编译内核：行程时间、停站时间、分段/待机能耗、单一
+目的地的代价三元组以及期望代价网格填充（网格较大时按行多线程）。各内核与对应的
+`models.*` 函数或 NumPy 表达式逐步一致，结果逐位相同。内核带显式签名，导入时即
+编译或加载磁盘缓存；`estimate_destination_cfunc` 向 C 调用方导出代价内核。未安装
+numba 时退化为纯 Python 实现。
+"""
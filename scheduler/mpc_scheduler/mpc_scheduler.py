@@ -5,29 +5,181 @@ Rolling-horizon (MPC-lite) scheduler without external solvers /
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Tuple
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
 
 from models import config as cfg
 from models.energy import segment_energy, standby_energy
 from models.kinematics import travel_time
 from models.temporal import hold_time
+from scheduler.mpc_scheduler.mpc_kernels import (
+    estimate_destination_cost,
+    fill_expected_costs,
+)
 from scheduler.mpc_scheduler.prediction_api import (
+    get_destination_model as _active_predictor,
     is_ready as _predictor_ready,
     predict_dest_distribution as _predict_distribution,
 )
 
+try:  # compiled pick, see scheduler/mpc_scheduler/_best_pair.pyx
+    from scheduler.mpc_scheduler._best_pair import best_pair as _best_pair
+except ImportError:  # pragma: no cover - extension is optional / 编译扩展为可选项
+    _best_pair = None
+
 
 MPC_LOOKAHEAD_WINDOW = cfg.MPC_LOOKAHEAD_WINDOW
 MPC_MAX_BATCH = cfg.MPC_MAX_BATCH
+MPC_TRIGGER_EPS = cfg.MPC_TRIGGER_EPS
+MPC_MAX_SKIP = cfg.MPC_MAX_SKIP
 SECONDS_PER_DAY = 24 * 3600.0
 DEST_TOP_K = 3
 
+# Floors are small integers, so 16 bits are exact; times stay float64 because
+# the eps bands and the 1e-6 finish-time tie term need full precision.
+# 楼层为小整数，16 位即可精确表示；时间保持 float64，eps 容差与 1e-6 完成时间
+# 平局项需要完整精度。
+_FLOOR_DTYPE = np.int16
+
+# Demand fields of a pending request; a row's tolist() tuple doubles as its
+# warm-start key. / 待分配请求的需求字段；行的 tolist() 元组同时作为热启动键。
+_REQUEST_DTYPE = np.dtype(
+    [
+        ("id", np.int64),
+        ("origin", _FLOOR_DTYPE),
+        ("destination", _FLOOR_DTYPE),
+        ("load", np.float64),
+        ("arrival", np.float64),
+    ]
+)
+
+
+@dataclass
+class _Plans:
+    """Planned state of each elevator, indexed by position / 按电梯位置索引的计划状态。"""
+
+    floor: np.ndarray
+    time: np.ndarray
+    version: np.ndarray  # bumped on every assignment / 每次分配后递增
+
+    @classmethod
+    def start(cls, elevators: List[object]) -> "_Plans":
+        count = len(elevators)
+        return cls(
+            floor=np.fromiter((elev.floor for elev in elevators), _FLOOR_DTYPE, count),
+            time=np.zeros(count),
+            version=np.zeros(count, dtype=np.int64),
+        )
+
 
 @dataclass
-class _PlanState:
-    floor: int
-    time: float
+class _CostGrid:
+    """
+    Expected costs of the candidate window, memoised per plan version /
+    候选窗口的期望代价，按电梯计划版本缓存。
+
+    EN: Rows live in fixed slots and `slots[i]` is the slot of `unassigned[i]`;
+    `rows[slot]` is its position in the pending request table.
+    Request-side terms are computed once, when the request enters the window.
+    A cell (slot, e) stays valid while elevator e keeps the plan version it was
+    computed against, so without new rows only the stale columns (usually the
+    winner's) are recomputed.
+
+    ZH: 行存放于固定槽位，`slots[i]` 为 `unassigned[i]` 的槽位，`rows[slot]` 为其
+    在待分配请求表中的位置。请求相关项仅在请求进入窗口时计算一次；只要电梯 e 的
+    计划版本未变，单元格 (slot, e) 即可复用，无新行时只重算过期的列（通常为获胜
+    电梯所在列）。
+    """
+
+    table: np.ndarray  # pending requests, _REQUEST_DTYPE / 待分配请求表
+    empty_runs: Tuple[np.ndarray, np.ndarray]  # see _empty_run_tables
+    rows: List[int]
+    slots: List[int]
+    fresh: np.ndarray  # row terms and costs are current / 行数据是否最新
+    versions: np.ndarray  # plan version behind each column / 各列对应的计划版本
+    origins: np.ndarray
+    terms: np.ndarray  # (slot, [arrival, dwell, dwell standby energy])
+    valid: np.ndarray  # has destination options / 是否存在目的地候选
+    rides: np.ndarray  # (prob/time/energy/standby, slot, destination)
+    costs: np.ndarray  # (cost/finish/passenger, slot, elevator)
+    # Request terms keyed by table row tuple, shared across warm-started calls /
+    # 以表行元组为键的请求项，在热启动调用之间共享
+    request_terms: Dict[tuple, tuple] = field(default_factory=dict)
+
+    @classmethod
+    def for_window(
+        cls, table: np.ndarray, window: List[int], plans: _Plans
+    ) -> "_CostGrid":
+        size = len(window)
+        num_elevators = len(plans.floor)
+        # Plans only ever move to actual destinations / 计划楼层只会是实际目的地
+        top_floor = max(
+            int(table["origin"].max()),
+            int(table["destination"].max()),
+            int(plans.floor.max()),
+        )
+        return cls(
+            table=table,
+            empty_runs=_empty_run_tables(top_floor),
+            rows=list(window),
+            slots=list(range(size)),
+            fresh=np.zeros(size, dtype=bool),
+            versions=np.full(num_elevators, -1),
+            origins=np.zeros(size, dtype=_FLOOR_DTYPE),
+            terms=np.zeros((size, 3)),
+            valid=np.zeros(size, dtype=bool),
+            rides=np.zeros((4, size, 1)),
+            costs=np.zeros((3, size, num_elevators)),
+        )
+
+    def replace(self, idx: int, row: int | None) -> None:
+        """Drop window entry `idx` and append table row `row` / 移出并补入表中的行。"""
+        slot = self.slots.pop(idx)
+        if row is None:
+            self.fresh[slot] = True  # slot retired / 槽位不再使用
+            return
+        self.rows[slot] = row
+        self.fresh[slot] = False
+        self.slots.append(slot)
+
+    def refresh(self, plans: _Plans, weekday) -> None:
+        """Recompute stale rows and columns / 重算过期的行与列。"""
+        plan_floors = plans.floor
+        plan_times = plans.time
+
+        new_rows = np.flatnonzero(~self.fresh)
+        fields = self.table[[self.rows[slot] for slot in new_rows]].tolist()
+        for slot, key in zip(new_rows, fields):
+            _, origin, destination, load, arrival = key
+            terms = self.request_terms.get(key)
+            if terms is None:
+                terms = _request_terms(origin, destination, load, arrival, weekday)
+                self.request_terms[key] = terms
+            dwell, dwell_energy, options = terms
+            if len(options) > self.rides.shape[2]:
+                extra = len(options) - self.rides.shape[2]
+                self.rides = np.pad(self.rides, ((0, 0), (0, 0), (0, extra)))
+            self.origins[slot] = origin
+            self.terms[slot] = (arrival, dwell, dwell_energy)
+            self.valid[slot] = bool(options)
+            self.rides[:, slot] = 0.0
+            for k, option in enumerate(options):
+                self.rides[:, slot, k] = option
+
+        # A new row needs every column; otherwise only stale columns are redone.
+        # One block per step: NumPy call overhead, not arithmetic, dominates here.
+        # 有新行时整表重算，否则只重算过期列；每步只算一个子块，因开销主要在调用次数。
+        if new_rows.size:
+            _evaluate_columns(self, slice(None), plan_floors, plan_times)
+        else:
+            stale_cols = np.flatnonzero(self.versions != plans.version)
+            if stale_cols.size:
+                _evaluate_columns(self, stale_cols, plan_floors, plan_times)
+        self.versions = plans.version.copy()
+        self.fresh[new_rows] = True
 
 
 def assign_requests_mpc(
@@ -37,6 +189,8 @@ def assign_requests_mpc(
     lookahead_window: float | None = None,
     max_batch: int | None = None,
     weekday: int | None = None,
+    state: Dict[str, object] | None = None,
+    sorted_input: bool = False,
 ) -> None:
     """
     Assign requests using a rolling-horizon heuristic /
@@ -48,6 +202,24 @@ def assign_requests_mpc(
         Maximum seconds beyond earliest unassigned arrival / 视窗长度（秒）。
     max_batch:
         Maximum candidate requests per iteration / 每轮评估的候选请求数。
+    state:
+        Optional dict kept by the caller across calls for warm starting /
+        调用方跨调用保存的热启动状态（可选）。Decisions of the previous call
+        are replayed while each step sees the same candidate window, so only
+        the steps after the first change are re-evaluated / 只要候选窗口与上次
+        一致就直接复用上次的决策，仅从首个变化处起重新评估。
+
+        Re-evaluation is event-triggered: a changed window, or an elevator
+        start floor drifting more than MPC_TRIGGER_EPS floors. Every
+        MPC_MAX_SKIP replayed steps one step is re-solved as a check; the replay
+        continues only if it reproduces the recorded decision /
+        重新评估由事件触发：候选窗口变化，或电梯起始楼层偏差超过 MPC_TRIGGER_EPS。
+        每复用 MPC_MAX_SKIP 步强制重算一步校验，结果一致才继续复用。
+    sorted_input:
+        Promise that `requests` is already in non-decreasing arrival order, so
+        the sort is skipped; the result then matches the sorted call exactly /
+        保证 `requests` 已按到达时刻非降序排列，从而跳过排序，结果与排序后调用
+        完全一致。
     """
     if not elevators:
         return
@@ -58,101 +230,420 @@ def assign_requests_mpc(
         batch_limit = max(len(elevators) * 3, 1)
 
     for elev in elevators:
-        elev.queue = []
-        elev.served_requests = []
+        _reset_list(elev, "queue")
+        _reset_list(elev, "served_requests")
 
     if not requests:
         return
 
-    unassigned = list(sorted(requests, key=lambda r: r.arrival_time))
-    plans = {elev.id: _PlanState(floor=elev.floor, time=0.0) for elev in elevators}
-    elevator_lookup = {elev.id: elev for elev in elevators}
+    if sorted_input:
+        pending = list(requests)
+    else:
+        pending = sorted(requests, key=lambda r: r.arrival_time)
+    if len(elevators) == 1 and all(
+        a.arrival_time < b.arrival_time for a, b in zip(pending, pending[1:])
+    ):
+        # A single car serves every request, so there is nothing to compare. The
+        # simulator serves its queue in arrival order, which is only fixed when
+        # arrivals are distinct: tied arrivals keep queue order, and that order is
+        # chosen by the MPC loop below.
+        # 单部电梯承担全部请求，无需比较代价。仿真按到达顺序服务队列，但仅在到达
+        # 时刻互不相同时顺序才确定：同时到达者保持队列顺序，须由下方 MPC 循环决定。
+        if state is not None:
+            state.clear()
+        _apply_assignments(elevators[0], pending)
+        return
+
+    # Every request inside the horizon is admitted and the batch is then topped
+    # up with later arrivals, so the candidate window is always the first
+    # `batch_limit` pending requests. Only that sorted prefix is kept as a list
+    # and refilled from a cursor, so removal costs O(batch) rather than O(n).
+    # 视窗内请求全部入选，不足批量时再补入后续请求，故候选窗口恒为待分配请求的
+    # 前 `batch_limit` 个；仅保留该有序前缀并由游标补充，删除代价为 O(批量)。
+    # The window holds positions into `pending`, whose demand fields are read
+    # once into a record array.
+    # 窗口保存 `pending` 中的位置，请求的需求字段一次性读入记录数组。
+    table = np.fromiter(
+        (
+            (r.id, r.origin, r.destination, r.load, r.arrival_time)
+            for r in pending
+        ),
+        dtype=_REQUEST_DTYPE,
+        count=len(pending),
+    )
+    unassigned = list(range(min(batch_limit, len(pending))))
+    next_pending = len(unassigned)
+    plans = _Plans.start(elevators)
     eps = 1e-9
     num_elevators = len(elevators)
     tie_cursor = 0
 
+    def advance_plan(pos: int, finish_time: float, floor: int) -> None:
+        plans.time[pos] = finish_time
+        plans.floor[pos] = floor
+        plans.version[pos] += 1
+
+    grid = _CostGrid.for_window(table, unassigned, plans)
+    # Written back to the elevators once the loop ends / 循环结束后一次性写回电梯
+    assigned: List[List[object]] = [[] for _ in range(num_elevators)]
+
+    def take(idx: int) -> object:
+        nonlocal next_pending
+        row = unassigned.pop(idx)
+        incoming = None
+        if next_pending < len(pending):
+            incoming = next_pending
+            unassigned.append(incoming)
+            next_pending += 1
+        grid.replace(idx, incoming)
+        return pending[row]
+
+    # Warm start: steps are (window_key, idx, elevator position, finish_time,
+    # tie_cursor) / 热启动：每步记录 (窗口键, 下标, 电梯位置, 完成时间, 轮转游标)
+    prev_steps: List[tuple] = []
+    steps: List[tuple] = []
+    request_keys: List[tuple] = []
+    if state is not None:
+        request_keys = table.tolist()
+        # The fit count catches a predictor refit in place between calls /
+        # 拟合计数用于识别调用之间被原地重新拟合的预测器
+        predictor = _active_predictor()
+        context = (
+            horizon,
+            batch_limit,
+            weekday,
+            predictor,
+            getattr(predictor, "fit_count", None),
+            tuple(elev.id for elev in elevators),
+        )
+        floors = [elev.floor for elev in elevators]
+        prev_floors = state.get("floors", ())
+        same_context = state.get("context") == context
+        if same_context and _floors_within_trigger(prev_floors, floors):
+            prev_steps = state.get("steps", [])
+        # Request terms depend only on the request and the context, so they
+        # survive elevator drift / 请求项只取决于请求与上下文，电梯楼层偏差不影响复用。
+        if same_context:
+            grid.request_terms = state.get("terms", {})
+        state["context"] = context
+        state["steps"] = steps
+        solved_from = floors
+    skipped = 0
+    recorded = None
+
     while unassigned:
-        earliest_arrival = unassigned[0].arrival_time
-        window_limit = earliest_arrival + horizon
-
-        candidate_indices: List[int] = []
-        for idx, req in enumerate(unassigned):
-            if req.arrival_time <= window_limit:
-                candidate_indices.append(idx)
-            elif len(candidate_indices) < batch_limit:
-                candidate_indices.append(idx)
-            if len(candidate_indices) >= batch_limit:
-                break
-
-        if not candidate_indices:
-            candidate_indices = list(range(min(batch_limit, len(unassigned))))
-
-        candidate_options: List[Tuple[float, float, float, int, int, int]] = []
-        for idx in candidate_indices:
-            req = unassigned[idx]
-            for elev_idx, elev in enumerate(elevators):
-                estimate = _estimate_incremental_cost(
-                    plans[elev.id], req, weekday=weekday
-                )
-                if estimate is None:
-                    continue
-                cost, finish_time, passenger_time = estimate
-                candidate_options.append(
-                    (cost, finish_time, passenger_time, idx, elev.id, elev_idx)
-                )
-
-        if not candidate_options:
+        candidate_indices = range(len(unassigned))
+
+        if state is not None:
+            window_key = tuple(request_keys[row] for row in unassigned)
+            step_no = len(steps)
+            recorded = None
+            if step_no < len(prev_steps) and prev_steps[step_no][0] == window_key:
+                recorded = prev_steps[step_no]
+            else:
+                prev_steps = []
+            if recorded is not None and (MPC_MAX_SKIP <= 0 or skipped < MPC_MAX_SKIP):
+                _, idx, pos, finish_time, tie_cursor = recorded
+                if step_no == 0:
+                    solved_from = prev_floors
+                req = take(idx)
+                assigned[pos].append(req)
+                advance_plan(pos, finish_time, req.destination)
+                steps.append(recorded)
+                skipped += 1
+                continue
+            skipped = 0
+
+        if len(candidate_indices) > 1:
+            selection = _select_option_vec(
+                grid,
+                candidate_indices,
+                elevators,
+                plans,
+                tie_cursor,
+                eps,
+                weekday=weekday,
+            )
+        else:
+            selection = _select_option(
+                [pending[row] for row in unassigned],
+                candidate_indices,
+                elevators,
+                plans,
+                tie_cursor,
+                eps,
+                weekday=weekday,
+            )
+
+        if selection is None:
             # Fallback to least-busy elevator / 回退到最空闲电梯以避免停滞。
             idx = candidate_indices[0]
-            req = unassigned.pop(idx)
-            target_id = min(plans, key=lambda eid: plans[eid].time)
-            target_index = next(
-                (i for i, e in enumerate(elevators) if e.id == target_id), 0
+            req = take(idx)
+            pos = int(np.argmin(plans.time))  # earliest available / 最早可用
+            current_floor, finish_time = int(plans.floor[pos]), float(plans.time[pos])
+            estimate = _estimate_incremental_cost(
+                current_floor, finish_time, req, weekday=weekday
             )
-            estimate = _estimate_incremental_cost(plans[target_id], req, weekday=weekday)
-            finish_time = plans[target_id].time
             if estimate is not None:
                 finish_time = estimate[1]
-            _apply_assignment(elevator_lookup[target_id], req)
-            plans[target_id].time = finish_time
-            plans[target_id].floor = req.destination
-            tie_cursor = (target_index + 1) % num_elevators
+            assigned[pos].append(req)
+            advance_plan(pos, finish_time, req.destination)
+            tie_cursor = (pos + 1) % num_elevators
+            if state is not None:
+                steps.append((window_key, idx, pos, finish_time, tie_cursor))
+                if steps[-1] != recorded:
+                    prev_steps = []
             continue
 
-        min_cost = min(option[0] for option in candidate_options)
-        best_cost_options = [
-            opt for opt in candidate_options if opt[0] <= min_cost + eps
-        ]
-        min_finish = min(opt[1] for opt in best_cost_options)
-        best_finish_options = [
-            opt for opt in best_cost_options if opt[1] <= min_finish + eps
-        ]
-        min_passenger = min(opt[2] for opt in best_finish_options)
-        tied_options = [
-            opt for opt in best_finish_options if opt[2] <= min_passenger + eps
-        ]
-
-        selected_option = min(
-            tied_options,
-            key=lambda opt: ((opt[5] - tie_cursor) % num_elevators, opt[5]),
-        )
-        tie_used = len(tied_options) > 1
-
-        idx, elevator_id = selected_option[3], selected_option[4]
+        selected_option, tie_used = selection
+        idx, pos = selected_option[3], selected_option[5]
         finish_time = selected_option[1]
-        req = unassigned.pop(idx)
-        _apply_assignment(elevator_lookup[elevator_id], req)
-        plans[elevator_id].time = finish_time
-        plans[elevator_id].floor = req.destination
+        req = take(idx)
+        assigned[pos].append(req)
+        advance_plan(pos, finish_time, req.destination)
         if tie_used:
-            tie_cursor = (selected_option[5] + 1) % num_elevators
+            tie_cursor = (pos + 1) % num_elevators
+        if state is not None:
+            steps.append((window_key, idx, pos, finish_time, tie_cursor))
+            if steps[-1] != recorded:
+                prev_steps = []
+
+    if state is not None:
+        # A replayed plan stays tied to the floors it was solved from, so small
+        # drifts are measured against them and cannot add up across calls.
+        # 复用的计划仍以其求解时的楼层为基准，小幅偏差据此比较，不会跨调用累积。
+        state["floors"] = solved_from
+        # Replayed steps compute no terms, so the cache keeps earlier entries and
+        # only drops requests that left the batch.
+        # 复用的步骤不计算请求项，故缓存保留已有条目，仅剔除已不在本批中的请求。
+        batch = set(request_keys)
+        state["terms"] = {
+            key: terms for key, terms in grid.request_terms.items() if key in batch
+        }
+
+    for elev, reqs in zip(elevators, assigned):
+        _apply_assignments(elev, reqs)
+
+
+def _select_option(
+    unassigned: List[object],
+    candidate_indices: Sequence[int],
+    elevators: List[object],
+    plans: _Plans,
+    tie_cursor: int,
+    eps: float,
+    *,
+    weekday: int | None = None,
+) -> Tuple[Tuple[float, float, float, int, int, int], bool] | None:
+    """Pick the best (candidate, elevator) pair one by one / 逐对评估并选出最优组合。"""
+    plan_floors = plans.floor.tolist()
+    plan_times = plans.time.tolist()
+    shape = (len(candidate_indices), len(elevators))
+    expected_cost = np.full(shape, np.inf)
+    expected_finish = np.zeros(shape)
+    expected_passenger = np.zeros(shape)
+    for c, idx in enumerate(candidate_indices):
+        req = unassigned[idx]
+        for e in range(len(elevators)):
+            estimate = _estimate_incremental_cost(
+                plan_floors[e], plan_times[e], req, weekday=weekday
+            )
+            if estimate is None:
+                break  # no destination options for this request / 该请求无目的地候选
+            cost, finish_time, passenger_time = estimate
+            expected_cost[c, e] = cost
+            expected_finish[c, e] = finish_time
+            expected_passenger[c, e] = passenger_time
+
+    if np.isinf(expected_cost).all():
+        return None
+
+    c, e, tie_used = _pick_lexicographic(
+        expected_cost, expected_finish, expected_passenger, tie_cursor, eps
+    )
+    selected_option = (
+        float(expected_cost[c, e]),
+        float(expected_finish[c, e]),
+        float(expected_passenger[c, e]),
+        candidate_indices[c],
+        elevators[e].id,
+        e,
+    )
+    return selected_option, tie_used
+
+
+def _select_option_vec(
+    grid: _CostGrid,
+    candidate_indices: Sequence[int],
+    elevators: List[object],
+    plans: _Plans,
+    tie_cursor: int,
+    eps: float,
+    *,
+    weekday: int | None = None,
+) -> Tuple[Tuple[float, float, float, int, int, int], bool] | None:
+    """
+    Evaluate every (candidate, elevator) pair at once / 一次性评估全部（候选, 电梯）组合。
+
+    EN: Costs come from the memoised window grid, which recomputes only the
+    cells whose request or elevator plan changed; the lexicographic tie-break
+    then runs over the whole grid exactly as in the scalar path.
+
+    ZH: 代价取自按版本缓存的窗口网格，仅重算请求或电梯计划发生变化的单元格；
+    随后在整张网格上执行与标量路径完全一致的字典序平局规则。
+    """
+    grid.refresh(plans, weekday)
+    order = np.array([grid.slots[i] for i in candidate_indices])
+
+    # Candidates without destination options are skipped, as in the scalar path
+    # 无目的地候选的请求与标量路径一样被跳过
+    valid = grid.valid[order]
+    if not valid.any():
+        return None
+
+    expected_cost, expected_finish, expected_passenger = grid.costs[:, order]
+    expected_cost[~valid] = np.inf
+    c, e, tie_used = _pick_lexicographic(
+        expected_cost, expected_finish, expected_passenger, tie_cursor, eps
+    )
+    selected_option = (
+        float(expected_cost[c, e]),
+        float(expected_finish[c, e]),
+        float(expected_passenger[c, e]),
+        candidate_indices[c],
+        elevators[e].id,
+        e,
+    )
+    return selected_option, tie_used
+
+
+def _pick_lexicographic(
+    expected_cost: np.ndarray,
+    expected_finish: np.ndarray,
+    expected_passenger: np.ndarray,
+    tie_cursor: int,
+    eps: float,
+) -> Tuple[int, int, bool]:
+    """
+    Branchless (candidate, elevator) pick over a cost grid / 基于掩码的无分支择优。
+
+    EN: Keeps pairs within `eps` of the best cost, then of the best finish time,
+    then of the best passenger time; among the survivors the elevator closest
+    after `tie_cursor` wins, then the earliest candidate. The eps bands are not
+    a total order, so a composite key or lexsort would pick differently. Uses
+    the compiled `_best_pair` when it is built. Returns (candidate row,
+    elevator position, whether several pairs tied).
+
+    ZH: 依次保留代价、完成时间、乘客时间在最优值 `eps` 范围内的组合；剩余组合中
+    取 `tie_cursor` 之后最近的电梯，再取最靠前的候选。eps 容差并非全序，复合键或
+    lexsort 会改变结果。已编译时使用 `_best_pair`。返回（候选行, 电梯位置,
+    是否存在多个并列组合）。
+    """
+    if _best_pair is not None:
+        return _best_pair(
+            expected_cost, expected_finish, expected_passenger, tie_cursor, eps
+        )
+
+    tied = expected_cost <= expected_cost.min() + eps
+    min_finish = np.where(tied, expected_finish, np.inf).min()
+    tied &= expected_finish <= min_finish + eps
+    min_passenger = np.where(tied, expected_passenger, np.inf).min()
+    tied &= expected_passenger <= min_passenger + eps
+
+    n_elev = expected_cost.shape[1]
+    rotation = (np.arange(n_elev) - tie_cursor) % n_elev
+    e = int(np.argmin(np.where(tied.any(axis=0), rotation, n_elev)))
+    c = int(np.argmax(tied[:, e]))
+    return c, e, int(np.count_nonzero(tied)) > 1
+
+
+def _evaluate_columns(grid: _CostGrid, cols, plan_floors, plan_times) -> None:
+    """Recompute the given elevator columns of the grid / 重算网格中指定电梯列。
+
+    EN: The compiled fill uses the same operation order as
+    `_cost_for_destination`, so every cell matches the scalar path exactly no
+    matter which pass computed it.
+
+    ZH: 编译填充内核与 `_cost_for_destination` 运算顺序相同，任一单元格无论在
+    哪一轮计算都与标量路径结果完全一致。
+    """
+    if isinstance(cols, slice):
+        cols = np.arange(len(plan_floors))
+    travel_table, energy_table = grid.empty_runs
+    # (candidate, elevator) gathers from the floor-pair tables / 按楼层对查表
+    index = (plan_floors[cols][None, :], grid.origins[:, None])
+    empty_energy = energy_table[index]
+    at_origin = plan_times[cols][None, :] + travel_table[index]
+    fill_expected_costs(
+        at_origin, empty_energy, grid.terms, grid.rides, cols, grid.costs
+    )
+
+
+def _request_terms(
+    origin: int, destination: int, load: float, arrival: float, weekday: int | None
+) -> Tuple[float, float, List[Tuple[float, float, float, float]]]:
+    """Elevator-independent cost terms of a request / 与电梯无关的请求代价项。
+
+    Returns (dwell, standby energy of dwell, [(prob, ride time, ride traction
+    energy, ride standby energy), ...]) / 返回（停站时间, 停站待机能耗,
+    [(概率, 乘梯时间, 乘梯牵引能耗, 乘梯待机能耗), ...]）。
+    """
+    dwell = hold_time(load, 0.0)
+    options = []
+    for target, prob in _destination_candidates(origin, destination, arrival, weekday):
+        travel_to_dest = travel_time(load, origin, target)
+        if origin != target:
+            distance = abs(target - origin) * cfg.BUILDING_FLOOR_HEIGHT
+            ride_energy = segment_energy(load, distance, target > origin)
+            ride_standby = standby_energy(travel_to_dest)
+        else:
+            ride_energy = 0.0
+            ride_standby = 0.0
+        options.append((prob, travel_to_dest, ride_energy, ride_standby))
+    dwell_energy = standby_energy(dwell) if dwell > 0.0 else 0.0
+    return dwell, dwell_energy, options
+
+
+@lru_cache(maxsize=None)
+def _empty_run_tables(top_floor: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Empty-run time and energy for every floor pair / 各楼层对的空载时间与能耗表。
+
+    Both tables are indexed [current floor, origin] for floors 0..top_floor
+    and hold exactly the values of `_empty_run` / 两表均按 [当前楼层, 起点]
+    索引（楼层 0..top_floor），取值与 `_empty_run` 完全相同。
+    """
+    floors = range(max(top_floor, cfg.BUILDING_FLOORS) + 1)
+    runs = np.array([[_empty_run(a, b) for b in floors] for a in floors])
+    return np.ascontiguousarray(runs[:, :, 0]), np.ascontiguousarray(runs[:, :, 1])
+
+
+def _empty_run(current_floor: int, origin: int) -> Tuple[float, float]:
+    """Empty run to the origin as (travel time, energy) / 空载驶向起点的（时间, 能耗）。"""
+    travel_to_origin = travel_time(0.0, current_floor, origin)
+    if current_floor == origin:
+        return travel_to_origin, 0.0
+    distance = abs(current_floor - origin) * cfg.BUILDING_FLOOR_HEIGHT
+    energy = segment_energy(0.0, distance, origin > current_floor)
+    return travel_to_origin, energy + standby_energy(travel_to_origin)
+
+
+def _floors_within_trigger(previous, current) -> bool:
+    if len(previous) != len(current):
+        return False
+    return all(abs(a - b) <= MPC_TRIGGER_EPS for a, b in zip(previous, current))
 
 
 def _estimate_incremental_cost(
-    plan: _PlanState, request: object, *, weekday: int | None = None
+    current_floor: int,
+    available_time: float,
+    request: object,
+    *,
+    weekday: int | None = None,
 ) -> Tuple[float, float, float] | None:
     """Return expected (cost, finish_time, passenger_time) under predicted destinations."""
-    candidates = _destination_candidates(request, weekday)
+    candidates = _destination_candidates(
+        request.origin, request.destination, request.arrival_time, weekday
+    )
     if not candidates:
         return None
 
@@ -161,7 +652,9 @@ def _estimate_incremental_cost(
     expected_passenger = 0.0
 
     for destination, prob in candidates:
-        cost, finish_time, passenger_time = _cost_for_destination(plan, request, destination)
+        cost, finish_time, passenger_time = _cost_for_destination(
+            current_floor, available_time, request, destination
+        )
         expected_cost += prob * cost
         expected_finish += prob * finish_time
         expected_passenger += prob * passenger_time
@@ -169,11 +662,12 @@ def _estimate_incremental_cost(
     return expected_cost, expected_finish, expected_passenger
 
 
-def _destination_candidates(request: object, weekday: int | None) -> List[Tuple[int, float]]:
-    origin = request.origin
+def _destination_candidates(
+    origin: int, destination: int, arrival_time: float, weekday: int | None
+) -> List[Tuple[int, float]]:
     if _predictor_ready():
         weekday_idx = 0 if weekday is None else int(weekday)
-        time_s = float(request.arrival_time % SECONDS_PER_DAY)
+        time_s = float(arrival_time % SECONDS_PER_DAY)
         try:
             dist = _predict_distribution(
                 origin,
@@ -192,7 +686,7 @@ def _destination_candidates(request: object, weekday: int | None) -> List[Tuple[
                 return [(int(dest), prob / total_prob) for dest, prob in top_items]
 
     # Fallback: use the actual request destination with certainty
-    destination = int(getattr(request, "destination", origin))
+    destination = int(destination)
     if destination == origin:
         # ensure we avoid zero-prob degenerate case by allowing same floor when necessary
         return [(destination, 1.0)]
@@ -200,51 +694,28 @@ def _destination_candidates(request: object, weekday: int | None) -> List[Tuple[
 
 
 def _cost_for_destination(
-    plan: _PlanState, request: object, destination: int
+    current_floor: int, available_time: float, request: object, destination: int
 ) -> Tuple[float, float, float]:
-    current_floor = plan.floor
-    available_time = plan.time
-    origin = request.origin
-
-    travel_to_origin = travel_time(0.0, current_floor, origin)
-    arrival_at_origin = available_time + travel_to_origin
-    start_service = max(arrival_at_origin, request.arrival_time)
-    dwell = hold_time(request.load, 0.0)
-    depart_time = start_service + dwell
-    travel_to_dest = travel_time(request.load, origin, destination)
-    finish_time = depart_time + travel_to_dest
-
-    passenger_time = finish_time - request.arrival_time
-
-    energy = 0.0
-    if current_floor != origin:
-        distance = abs(current_floor - origin) * cfg.BUILDING_FLOOR_HEIGHT
-        energy += segment_energy(0.0, distance, _direction(current_floor, origin))
-        energy += standby_energy(travel_to_origin)
-
-    energy += standby_energy(dwell)
-
-    if origin != destination:
-        distance = abs(destination - origin) * cfg.BUILDING_FLOOR_HEIGHT
-        energy += segment_energy(
-            request.load, distance, _direction(origin, destination)
-        )
-        energy += standby_energy(travel_to_dest)
-
-    total_cost = cfg.WEIGHT_TIME * passenger_time + cfg.WEIGHT_ENERGY * energy
-    total_cost += 1e-6 * finish_time
+    return estimate_destination_cost(
+        current_floor,
+        available_time,
+        request.origin,
+        destination,
+        request.load,
+        request.arrival_time,
+    )
 
-    return total_cost, finish_time, passenger_time
 
+def _reset_list(elevator, name: str) -> None:
+    """Empty a per-elevator list in place, creating it if missing / 原地清空电梯列表，缺失时新建。"""
+    items = getattr(elevator, name, None)
+    if items is None:
+        setattr(elevator, name, [])
+    else:
+        items.clear()
 
-def _apply_assignment(elevator, request: object) -> None:
-    elevator.queue.append(request)
-    elevator.served_requests.append(request)
 
+def _apply_assignments(elevator, requests: List[object]) -> None:
+    elevator.queue.extend(requests)
+    elevator.served_requests.extend(requests)
 
-def _direction(start: int, end: int) -> str:
-    if end > start:
-        return "up"
-    if end < start:
-        return "down"
-    return "up"
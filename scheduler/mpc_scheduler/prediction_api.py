@@ -24,6 +24,11 @@ def set_destination_model(model: DestinationLogisticModel) -> None:
     _MODEL = model
 
 
+def get_destination_model() -> DestinationLogisticModel | None:
+    """Return the active predictor, if any / 返回当前生效的预测器（可能为空）。"""
+    return _MODEL
+
+
 def load_destination_model(path: str) -> None:
     """Load a saved model (.pkl) and install it as the active predictor."""
     model = DestinationLogisticModel.load(path)
@@ -73,6 +78,7 @@ def predict_dest_top1(
 
 __all__ = [
     "set_destination_model",
+    "get_destination_model",
     "load_destination_model",
     "is_ready",
     "predict_dest_distribution",
@@ -0,0 +1,57 @@
+import unittest
+
+from models import kinematics, kinematics_fast
+
+
+class FractionalFloorTest(unittest.TestCase):
+    CASES = [(0.0, 1.5, 4.25), (640.0, 7.75, 2.5), (320.0, 3.0, 3.5)]
+
+    def _expected(self, load, origin, destination):
+        return float(kinematics.travel_time_vec(load, origin, destination))
+
+    def test_compiled_kernel_keeps_fractional_floors(self):
+        for load, origin, destination in self.CASES:
+            with self.subTest(origin=origin, destination=destination):
+                self.assertAlmostEqual(
+                    kinematics_fast.travel_time(load, origin, destination),
+                    self._expected(load, origin, destination),
+                    places=9,
+                )
+
+    def test_python_kernel_keeps_fractional_floors(self):
+        # Without numba the kernel is the plain function / 无 numba 时内核即原函数
+        kernel = getattr(
+            kinematics_fast._travel_time_nb, "py_func", kinematics_fast._travel_time_nb
+        )
+        args = (
+            kinematics_fast._H,
+            kinematics_fast._CAPACITY,
+            kinematics_fast._VUF,
+            kinematics_fast._VUE,
+            kinematics_fast._VDF,
+            kinematics_fast._VDE,
+            kinematics_fast._K_S,
+            kinematics_fast._AUF,
+            kinematics_fast._AUE,
+            kinematics_fast._K_A,
+            kinematics_fast._DUF,
+            kinematics_fast._DUE,
+            kinematics_fast._SQUARE,
+        )
+        for load, origin, destination in self.CASES:
+            with self.subTest(origin=origin, destination=destination):
+                self.assertAlmostEqual(
+                    kernel(load, origin, destination, *args),
+                    self._expected(load, origin, destination),
+                    places=9,
+                )
+
+    def test_integer_floors_match_float_floors(self):
+        self.assertEqual(
+            kinematics_fast.travel_time(0.0, 1, 4),
+            kinematics_fast.travel_time(0.0, 1.0, 4.0),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
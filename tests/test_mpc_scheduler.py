@@ -0,0 +1,25 @@
+import unittest
+
+from models.variables import ElevatorState, Request
+from scheduler.mpc_scheduler import mpc_scheduler as mpc
+
+
+def _queue(requests, elevators):
+    mpc.assign_requests_mpc(requests, elevators, weekday=0)
+    return [[r.id for r in elev.queue] for elev in elevators]
+
+
+class SingleElevatorTest(unittest.TestCase):
+    def test_distinct_arrivals_keep_arrival_order(self):
+        requests = [Request(1, 14, 7, 70.0, 5.0), Request(2, 2, 5, 70.0, 0.0)]
+        self.assertEqual(_queue(requests, [ElevatorState(id=1, floor=1)]), [[2, 1]])
+
+    def test_tied_arrivals_are_ordered_by_the_mpc_loop(self):
+        # The far request comes first in the input, but the car is next to the
+        # other one / 输入中远处的请求在前，但电梯紧邻另一请求
+        requests = [Request(1, 14, 7, 70.0, 0.0), Request(2, 2, 5, 70.0, 0.0)]
+        self.assertEqual(_queue(requests, [ElevatorState(id=1, floor=1)]), [[2, 1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
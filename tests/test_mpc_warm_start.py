@@ -0,0 +1,150 @@
+import unittest
+from unittest import mock
+
+from models.request import generate_requests_weekday
+from models.variables import ElevatorState, Request
+from scheduler.mpc_scheduler import mpc_scheduler as mpc
+from scheduler.mpc_scheduler import prediction_api
+from scheduler.mpc_scheduler.destination_prediction import DestinationLogisticModel
+
+# A weekday profile squeezed tenfold in time, so elevators stay busy and every
+# decision depends on the plans carried over from earlier steps.
+_REQUESTS = [
+    Request(r.id, r.origin, r.destination, r.load, r.arrival_time / 10.0)
+    for r in sorted(
+        generate_requests_weekday(400, seed_shift=7), key=lambda r: r.arrival_time
+    )
+]
+
+
+def _run(requests, *, state=None, start_floor=1, weekday=0):
+    """Assign a private copy of `requests`; return per-elevator request ids."""
+    batch = [
+        Request(r.id, r.origin, r.destination, r.load, r.arrival_time)
+        for r in requests
+    ]
+    elevators = [ElevatorState(id=k + 1, floor=start_floor) for k in range(4)]
+    mpc.assign_requests_mpc(batch, elevators, weekday=weekday, state=state)
+    return [[r.id for r in elev.queue] for elev in elevators]
+
+
+class WarmStartTest(unittest.TestCase):
+    def test_identical_call_replays_every_step(self):
+        state = {}
+        cold = _run(_REQUESTS, state=state)
+        with mock.patch.object(
+            mpc, "_select_option_vec", side_effect=AssertionError("re-solved")
+        ):
+            warm = _run(_REQUESTS, state=state)
+        self.assertEqual(warm, cold)
+
+    def test_appended_requests_match_cold_start(self):
+        state = {}
+        _run(_REQUESTS[:300], state=state)
+        self.assertEqual(_run(_REQUESTS, state=state), _run(_REQUESTS))
+
+    def test_replayed_call_keeps_request_terms(self):
+        state = {}
+        _run(_REQUESTS[:300], state=state)
+        _run(_REQUESTS[:300], state=state)
+        self.assertEqual(len(state["terms"]), 300)
+        with mock.patch.object(
+            mpc, "_request_terms", wraps=mpc._request_terms
+        ) as request_terms:
+            _run(_REQUESTS, state=state)
+        self.assertEqual(request_terms.call_count, 100)
+        _run(_REQUESTS[100:], state=state)
+        self.assertEqual(len(state["terms"]), 300)
+
+    def test_inserted_request_matches_cold_start(self):
+        middle = _REQUESTS[200].arrival_time + 0.5
+        changed = _REQUESTS + [Request(99999, 3, 7, 70.0, middle)]
+        state = {}
+        _run(_REQUESTS, state=state)
+        self.assertEqual(_run(changed, state=state), _run(changed))
+
+    def test_changed_context_is_not_replayed(self):
+        state = {}
+        _run(_REQUESTS, state=state)
+        self.assertEqual(
+            _run(_REQUESTS, state=state, weekday=3), _run(_REQUESTS, weekday=3)
+        )
+
+    def test_refit_predictor_is_not_replayed(self):
+        previous = prediction_api.get_destination_model()
+        self.addCleanup(prediction_api.set_destination_model, previous)
+        model = DestinationLogisticModel(random_seed=0)
+        model.fit_batch(_REQUESTS, weekday=0, epochs=1)
+        prediction_api.set_destination_model(model)
+
+        state = {}
+        _run(_REQUESTS, state=state)
+        model.add_samples(_REQUESTS[:50], weekday=0)
+        with mock.patch.object(
+            mpc, "_request_terms", wraps=mpc._request_terms
+        ) as request_terms:
+            warm = _run(_REQUESTS, state=state)
+        self.assertEqual(request_terms.call_count, len(_REQUESTS))
+        self.assertEqual(warm, _run(_REQUESTS))
+
+
+class TriggerTest(unittest.TestCase):
+    def _count_solves(self):
+        return mock.patch.object(
+            mpc, "_select_option_vec", wraps=mpc._select_option_vec
+        )
+
+    def test_floor_drift_re_solves_by_default(self):
+        state = {}
+        _run(_REQUESTS, state=state)
+        with self._count_solves() as solve:
+            warm = _run(_REQUESTS, state=state, start_floor=2)
+        self.assertGreater(solve.call_count, 0)
+        self.assertEqual(warm, _run(_REQUESTS, start_floor=2))
+
+    def test_drift_within_trigger_eps_replays(self):
+        with mock.patch.object(mpc, "MPC_TRIGGER_EPS", 1.0):
+            state = {}
+            cold = _run(_REQUESTS, state=state)
+            with self._count_solves() as solve:
+                warm = _run(_REQUESTS, state=state, start_floor=2)
+            self.assertEqual(solve.call_count, 0)
+            self.assertEqual(warm, cold)
+
+            with self._count_solves() as solve:
+                _run(_REQUESTS, state=state, start_floor=4)
+            self.assertGreater(solve.call_count, 0)
+
+    def test_stepwise_drift_does_not_accumulate(self):
+        with mock.patch.object(mpc, "MPC_TRIGGER_EPS", 1.0):
+            state = {}
+            _run(_REQUESTS, state=state)
+            for floor in range(2, 9):
+                with self._count_solves() as solve:
+                    warm = _run(_REQUESTS, state=state, start_floor=floor)
+                if floor % 2:
+                    # Two floors from the plan's own start / 距计划起始楼层两层
+                    self.assertGreater(solve.call_count, 0)
+                    self.assertEqual(warm, _run(_REQUESTS, start_floor=floor))
+                else:
+                    self.assertEqual(solve.call_count, 0)
+
+    def test_max_skip_forces_periodic_checks(self):
+        with mock.patch.object(mpc, "MPC_MAX_SKIP", 10):
+            state = {}
+            cold = _run(_REQUESTS, state=state)
+            with self._count_solves() as solve:
+                warm = _run(_REQUESTS, state=state)
+        self.assertEqual(warm, cold)
+        # One check after every 10 replayed steps / 每复用 10 步校验一次
+        self.assertEqual(solve.call_count, (len(_REQUESTS) - 1) // 11)
+
+    def test_floors_within_trigger(self):
+        with mock.patch.object(mpc, "MPC_TRIGGER_EPS", 1.0):
+            self.assertTrue(mpc._floors_within_trigger([1, 5], [2, 4]))
+            self.assertFalse(mpc._floors_within_trigger([1, 5], [3, 5]))
+            self.assertFalse(mpc._floors_within_trigger([1, 5], [1, 5, 1]))
+
+
+if __name__ == "__main__":
+    unittest.main()